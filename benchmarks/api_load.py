@@ -0,0 +1,159 @@
+import argparse
+import http.client
+import io
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from parallelfunc import default_workers
+from server import NPY_TYPE, EvaluationServer
+
+# Prueba de carga del servicio HTTP (server.py) en una sola máquina: varios
+# clientes con conexiones persistentes envían lotes de estados durante un
+# tiempo fijo, en JSON y en .npy, y se reportan solicitudes por segundo, filas
+# por segundo y latencias. Sin --url se inicia el servidor en este proceso.
+# Uso, desde la raíz del repositorio:
+#     python -m benchmarks.api_load --clients 8 --batch 1000 100000
+#     python -m benchmarks.api_load --url http://127.0.0.1:8765
+
+
+def _json_body(states, material):
+    return json.dumps({"states": states.tolist(), **material}).encode()
+
+
+def _npy_body(states):
+    buffer = io.BytesIO()
+    np.save(buffer, states)
+    return buffer.getvalue()
+
+
+# un cliente: envía la misma solicitud hasta que se cumple deadline
+def _client(host, port, path, body, content_type, deadline, latencies, errors):
+    connection = http.client.HTTPConnection(host, port, timeout=600)
+    headers = {"Content-Type": content_type}
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            connection.request("POST", path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                return
+            latencies.append(time.perf_counter() - start)
+    except OSError as error:
+        errors.append(repr(error))
+    finally:
+        connection.close()
+
+
+def run_case(host, port, fmt, batch, clients, duration, material, seed=0):
+    states = np.random.default_rng(seed).uniform(-200.0, 200.0, (batch, 3))
+    if fmt == "json":
+        path, body, content_type = (
+            "/evaluate",
+            _json_body(states, material),
+            "application/json",
+        )
+    else:
+        query = "&".join(f"{key}={value}" for key, value in material.items())
+        path, body, content_type = f"/evaluate?{query}", _npy_body(states), NPY_TYPE
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(host, port, path, body, content_type, deadline, latencies, errors),
+        )
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    requests = len(latencies)
+    p50, p95, p99 = (
+        np.percentile(latencies, [50, 95, 99]) if latencies else (np.nan,) * 3
+    )
+    return {
+        "formato": fmt,
+        "filas_por_solicitud": batch,
+        "clientes": clients,
+        "solicitudes": requests,
+        "solicitudes_por_s": requests / elapsed,
+        "filas_por_s": requests * batch / elapsed,
+        "bytes_por_solicitud": len(body),
+        "p50_s": p50,
+        "p95_s": p95,
+        "p99_s": p99,
+        "errores": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prueba de carga del servicio HTTP de evaluación"
+    )
+    parser.add_argument("--url", help="servidor ya iniciado; sin esto se inicia uno")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="segundos por caso")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 1000, 100_000])
+    parser.add_argument(
+        "--formats", nargs="+", default=["json", "npy"], choices=["json", "npy"]
+    )
+    parser.add_argument("--save", help="archivo JSON para guardar los resultados")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = EvaluationServer(("127.0.0.1", 0), args.workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+
+    material = {"sigma_yield": 250.0, "sigma_u": 300.0}
+    print(
+        f"{'formato':>7} {'filas':>8} {'sol/s':>9} {'filas/s':>13} "
+        f"{'p50':>9} {'p95':>9} {'p99':>9}"
+    )
+    results = []
+    try:
+        for batch in args.batch:
+            for fmt in args.formats:
+                case = run_case(
+                    host, port, fmt, batch, args.clients, args.duration, material
+                )
+                results.append(case)
+                print(
+                    f"{fmt:>7} {batch:8d} {case['solicitudes_por_s']:9.1f} "
+                    f"{case['filas_por_s']:13,.0f} "
+                    + " ".join(
+                        f"{case[key] * 1e3:7.1f}ms"
+                        for key in ("p50_s", "p95_s", "p99_s")
+                    )
+                )
+                for error in case["errores"]:
+                    print(f"ERROR {error}")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Resultados guardados en {args.save}")
+
+
+if __name__ == "__main__":
+    main()
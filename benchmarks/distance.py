@@ -0,0 +1,104 @@
+import argparse
+import time
+
+import numpy as np
+
+from distancefunc import PolygonIndex, _nearest2, envelope_distance
+from envelopefunc import trace_envelope
+
+# Rendimiento de la distancia con signo a las envolventes de falla: la forma
+# cerrada de cada criterio, el índice de malla sobre la envolvente trazada y la
+# búsqueda exhaustiva sobre todos los lados del mismo polígono. Uso, desde la
+# raíz del repositorio:
+#     python -m benchmarks.distance --points 2000000
+
+MATERIAL = {
+    "tresca": {"sigma_yield": 250.0},
+    "von_mises": {"sigma_yield": 250.0},
+    "rankine": {"sigma_u": 300.0},
+    "mohr": {"sigma_uc": 400.0, "sigma_ut": 100.0},
+}
+
+
+def best_time(func, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# todos los lados contra todos los puntos, por bloques
+def brute_force(index, sigma1, sigma2, block=4096):
+    for start in range(0, len(sigma1), block):
+        rows = slice(start, start + block)
+        _nearest2(sigma1[rows, None], sigma2[rows, None], index.segments).min(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Distancia a las envolventes de falla: forma cerrada, índice "
+        "de malla y búsqueda exhaustiva"
+    )
+    parser.add_argument("--points", type=int, default=2_000_000)
+    parser.add_argument(
+        "--brute-points",
+        type=int,
+        default=200_000,
+        help="puntos para medir la búsqueda exhaustiva, se extrapola al total",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        nargs="+",
+        default=[1e-3, 1e-4],
+        help="tolerancias de la envolvente trazada, relativas a la resistencia",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    n = args.points
+    # estados hasta el doble de la resistencia, dentro y fuera de la envolvente
+    sigma1, sigma2 = rng.uniform(-600.0, 600.0, (2, n))
+    m = min(args.brute_points, n)
+
+    print(f"{n:,} puntos (búsqueda exhaustiva medida con {m:,} y extrapolada)")
+    print(f"{'caso':42s} {'lados':>6} {'tiempo (s)':>11} {'puntos/s':>14}")
+    for criterion, material in MATERIAL.items():
+        rate = n / best_time(
+            lambda: envelope_distance(criterion, sigma1, sigma2, **material),
+            args.repeat,
+        )
+        label = f"{criterion} forma cerrada"
+        print(f"{label:42s} {'':>6} {n / rate:11.3f} {rate:14,.0f}")
+
+        strength = max(material.values())
+        for tolerance in args.tolerance:
+            envelope = trace_envelope(
+                criterion, tolerance * strength, max_points=65_536, **material
+            )
+            start = time.perf_counter()
+            index = PolygonIndex(envelope.points)
+            build = time.perf_counter() - start
+            edges = len(index.segments[0])
+            cases = [
+                (f"índice (tol {tolerance:g}, {build:.2f} s)", index.distance, n),
+                (
+                    f"exhaustiva (tol {tolerance:g})",
+                    lambda x, y, index=index: brute_force(index, x, y),
+                    m,
+                ),
+            ]
+            for name, func, count in cases:
+                rate = count / best_time(
+                    lambda: func(sigma1[:count], sigma2[:count]), args.repeat
+                )
+                label = f"{criterion} {name}"
+                print(f"{label:42s} {edges:6d} {n / rate:11.3f} {rate:14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import failurefunc
+import fsmapfunc
+import stressfunc
+
+# Benchmarks de las funciones de stressfunc y failurefunc, y de las páginas
+# completas con el AppTest de Streamlit. Uso, desde la raíz del repositorio:
+#     python -m benchmarks.kernels --save benchmarks/results.json
+#     python -m benchmarks.kernels --baseline benchmarks/baseline.json
+# Con --baseline el proceso termina con código 1 si algún caso es más lento que
+# la línea base por encima de --threshold
+
+PAGES = ("stress-transf.py", "strain-transf.py", "failure.py")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# mejor tiempo por llamada, repitiendo hasta que cada medición dure min_time
+def measure(func, repeat=5, min_time=0.05):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def random_states(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-200.0, 200.0, (3, size))
+
+
+# casos escalares: una llamada con floats de Python, como en las páginas
+def scalar_cases():
+    from matplotlib.figure import Figure
+
+    ax = Figure().add_subplot()
+
+    def draw_stress():
+        stressfunc.draw_stress(
+            0.2, 0.5, 30.0, 1, 0, 12.07, 11.83, "right", "normal", ax
+        )
+        # sin limpiar, los artistas se acumulan y el tiempo crece
+        ax.patches[-1].remove()
+        ax.texts[-1].remove()
+
+    return {
+        "transform_stress": lambda: stressfunc.transform_stress(10.0, 0.0, 5.0, 30.0),
+        "principal_stress": lambda: stressfunc.principal_stress(10.0, 0.0, 5.0),
+        "draw_stress": draw_stress,
+        "tresca": lambda: failurefunc.tresca(50.0, 100.0, 100.0),
+        "von_mises": lambda: failurefunc.von_mises(50.0, 100.0, 100.0),
+        "rankine": lambda: failurefunc.rankine(50.0, 100.0, 100.0),
+        "mohr": lambda: failurefunc.mohr(50.0, 100.0, 200.0, 100.0),
+    }
+
+
+# casos vectorizados sobre arreglos de tamaño size
+def batch_cases(size):
+    sigma_x, sigma_y, tau_xy = random_states(size)
+    tensors = np.random.default_rng(1).uniform(-200.0, 200.0, (6, size))
+    theta = np.linspace(-180.0, 180.0, size)
+    return {
+        "transform_stress": lambda: stressfunc.transform_stress(
+            sigma_x, sigma_y, tau_xy, theta
+        ),
+        "principal_stress_batch": lambda: stressfunc.principal_stress_batch(
+            sigma_x, sigma_y, tau_xy
+        ),
+        "principal_stress_3d": lambda: stressfunc.principal_stress_3d(*tensors),
+        "principal_stress_3d_eigh": lambda: stressfunc.principal_stress_3d(
+            *tensors, method="eigh"
+        ),
+        "tresca_batch": lambda: failurefunc.tresca_batch(sigma_x, sigma_y, 100.0),
+        "von_mises_batch": lambda: failurefunc.von_mises_batch(sigma_x, sigma_y, 100.0),
+        "rankine_batch": lambda: failurefunc.rankine_batch(sigma_x, sigma_y, 100.0),
+        "mohr_batch": lambda: failurefunc.mohr_batch(sigma_x, sigma_y, 200.0, 100.0),
+        "evaluate_criteria": lambda: failurefunc.evaluate_criteria(
+            sigma_x,
+            sigma_y,
+            sigma_yield=100.0,
+            sigma_u=100.0,
+            sigma_uc=200.0,
+            sigma_ut=100.0,
+        ),
+    }
+
+
+# Mapas del factor de seguridad de 2000 x 2000, con la malla adaptada a la
+# frontera FS = 1 y evaluando todos los puntos (tile=1)
+def map_cases():
+    cases = {}
+    for criterion, ratio in (("von_mises", None), ("mohr", 3.0)):
+        for tile in (16, 1):
+            cases[f"safety_factor_map:{criterion}:tile{tile}"] = (
+                lambda criterion=criterion, ratio=ratio, tile=tile: (
+                    fsmapfunc.safety_factor_map(criterion, 2000, 2.0, ratio, tile)
+                )
+            )
+    return cases
+
+
+# Ejecuciones completas de las páginas con AppTest: la primera ejecución y un
+# cambio de widget (ángulo o tipo de material) con valores nuevos cada vez,
+# para no medir solo la cache de imágenes
+def page_cases():
+    from streamlit.testing.v1 import AppTest
+
+    cases = {}
+    for page in PAGES:
+        path = os.path.join(ROOT, page)
+
+        def first_run(path=path):
+            AppTest.from_file(path, default_timeout=60).run()
+
+        app = AppTest.from_file(path, default_timeout=60).run()
+        angles = iter(np.arange(-179.0, 180.0, 1.0).tolist() * 1000)
+        materials = iter(["Frágil - Rankine", "Frágil - Mohr", "Dúctil"] * 10_000)
+
+        def interaction(app=app, page=page):
+            if page == "failure.py":
+                app.radio[0].set_value(next(materials)).run()
+            else:
+                app.slider(key="slider_theta").set_value(next(angles)).run()
+
+        name = page[:-3]
+        cases[f"page:{name}:first_run"] = first_run
+        cases[f"page:{name}:interaction"] = interaction
+    return cases
+
+
+def run(max_size, repeat, pages):
+    results = {}
+
+    for name, func in scalar_cases().items():
+        results[f"{name}:scalar"] = measure(func, repeat)
+        print(f"{name + ':scalar':40s} {results[f'{name}:scalar'] * 1e6:14.2f} us")
+
+    size = 1
+    while size <= max_size:
+        for name, func in batch_cases(size).items():
+            key = f"{name}:{size}"
+            results[key] = measure(func, repeat if size < 10**6 else 1)
+            print(f"{key:40s} {results[key] * 1e6:14.2f} us")
+        size *= 10
+
+    for name, func in map_cases().items():
+        results[name] = measure(func, repeat, min_time=0.0)
+        print(f"{name:40s} {results[name] * 1e3:14.2f} ms")
+
+    if pages:
+        for name, func in page_cases().items():
+            results[name] = measure(func, repeat, min_time=0.0)
+            print(f"{name:40s} {results[name] * 1e3:14.2f} ms")
+
+    return results
+
+
+# casos más lentos que la línea base por encima del umbral relativo
+def compare(results, baseline, threshold):
+    regressions = {}
+    for key, seconds in results.items():
+        reference = baseline.get(key)
+        if reference and seconds > reference * (1.0 + threshold):
+            regressions[key] = seconds / reference - 1.0
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de stressfunc, failurefunc y las páginas"
+    )
+    parser.add_argument("--max-size", type=int, default=10**7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-pages", action="store_true")
+    parser.add_argument("--save", help="archivo JSON para guardar los resultados")
+    parser.add_argument("--baseline", help="archivo JSON de una corrida anterior")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run(args.max_size, args.repeat, not args.no_pages)
+    document = {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "procesador": platform.processor() or platform.machine(),
+        },
+        "resultados_s": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(document, file, indent=2)
+        print(f"Resultados guardados en {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["resultados_s"]
+        regressions = compare(results, baseline, args.threshold)
+        for key, slowdown in sorted(regressions.items()):
+            print(f"REGRESIÓN {key}: {slowdown:+.0%}")
+        if regressions:
+            sys.exit(1)
+        print(f"Sin regresiones mayores a {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
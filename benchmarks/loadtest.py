@@ -0,0 +1,255 @@
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from figurefunc import process_rss
+
+# Prueba de carga de las páginas con muchas sesiones simultáneas, sin servicios
+# externos. Cada sesión es un AppTest de Streamlit en su propio hilo, dentro de
+# este proceso, igual que el servidor ejecuta cada sesión en un hilo propio.
+# Las sesiones repiten un guion de interacciones (enviar el formulario, mover
+# el slider del ángulo, cambiar el tipo de material) y se mide la latencia de
+# cada ejecución, el total de ejecuciones por segundo y la memoria del proceso.
+# AppTest vuelve a ejecutar la página completa en cada interacción, también
+# dentro de fragmentos, por lo que las latencias del slider son una cota
+# superior de las del servidor. Uso, desde la raíz del repositorio:
+#     python -m benchmarks.loadtest --sessions 60 --interactions 20
+
+PAGES = ("stress-transf.py", "strain-transf.py", "failure.py")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MATERIALS = ["Dúctil", "Frágil - Rankine", "Frágil - Mohr"]
+
+
+# Guion de una sesión de transformación: cada paso cambia un widget y devuelve
+# el nombre de la interacción; la ejecución la hace el que llama
+def transform_script(rng):
+    angle = 0.0
+    while True:
+        kind = rng.choices(["formulario", "slider", "angulo"], [1, 6, 1])[0]
+        if kind == "formulario":
+
+            def step(app):
+                for widget in app.number_input[:3]:
+                    widget.set_value(float(rng.randint(-20, 20) * 10))
+                app.button[0].click()
+
+        elif kind == "slider":
+            # barrido: el ángulo avanza de a poco, como al arrastrar
+            angle = (angle + rng.choice([1.0, 2.0, 5.0]) + 180.0) % 360.0 - 180.0
+
+            def step(app, angle=angle):
+                app.slider(key="slider_theta").set_value(angle)
+
+        else:
+
+            def step(app):
+                app.number_input(key="text_theta").set_value(
+                    float(rng.randint(-180, 180))
+                )
+
+        yield kind, step
+
+
+def failure_script(rng):
+    while True:
+        kind = rng.choices(["material", "esfuerzos"], [1, 2])[0]
+        if kind == "material":
+
+            def step(app):
+                app.radio[0].set_value(rng.choice(MATERIALS))
+
+        else:
+
+            def step(app):
+                app.number_input[0].set_value(float(rng.randint(-150, 150)))
+
+        yield kind, step
+
+
+SCRIPTS = {
+    "stress-transf.py": transform_script,
+    "strain-transf.py": transform_script,
+    "failure.py": failure_script,
+}
+
+
+class LoadTest:
+    def __init__(self, sessions, interactions, pages, think_time, ramp, seed):
+        self.sessions = sessions
+        self.interactions = interactions
+        self.pages = pages
+        self.think_time = think_time
+        self.ramp = ramp
+        self.seed = seed
+        # (página, interacción, segundos)
+        self.samples = []
+        self.errors = []
+        self.memory = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _record(self, page, kind, seconds):
+        with self._lock:
+            self.samples.append((page, kind, seconds))
+
+    def _session(self, index):
+        from streamlit.testing.v1 import AppTest
+
+        rng = random.Random(self.seed * 100_003 + index)
+        page = self.pages[index % len(self.pages)]
+        time.sleep(self.ramp * index / max(self.sessions, 1))
+        try:
+            start = time.perf_counter()
+            app = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600)
+            app.run()
+            self._record(page, "primera", time.perf_counter() - start)
+
+            script = SCRIPTS[page](rng)
+            for _ in range(self.interactions):
+                kind, step = next(script)
+                step(app)
+                start = time.perf_counter()
+                app.run()
+                self._record(page, kind, time.perf_counter() - start)
+                if app.exception:
+                    raise RuntimeError(app.exception[0].message)
+                if self.think_time:
+                    time.sleep(rng.expovariate(1.0 / self.think_time))
+        except Exception as error:
+            with self._lock:
+                self.errors.append(f"sesión {index} ({page}): {error!r}")
+
+    # memoria residente del proceso cada interval segundos
+    def _sample_memory(self, interval=0.2):
+        while not self._done.wait(interval):
+            self.memory.append(process_rss() or 0)
+
+    def run(self):
+        self.memory.append(process_rss() or 0)
+        sampler = threading.Thread(target=self._sample_memory, daemon=True)
+        sampler.start()
+        threads = [
+            threading.Thread(target=self._session, args=(i,), name=f"sesion-{i}")
+            for i in range(self.sessions)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+        self._done.set()
+        sampler.join()
+        self.memory.append(process_rss() or 0)
+        return self.report()
+
+    def report(self):
+        groups = {}
+        for page, kind, seconds in self.samples:
+            groups.setdefault(f"{page}:{kind}", []).append(seconds)
+            # los totales son de las interacciones, sin la primera ejecución
+            if kind != "primera":
+                groups.setdefault(f"{page}:interacciones", []).append(seconds)
+                groups.setdefault("interacciones", []).append(seconds)
+
+        latencies = {}
+        for name, values in sorted(groups.items()):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            latencies[name] = {
+                "n": len(values),
+                "p50_s": p50,
+                "p95_s": p95,
+                "p99_s": p99,
+                "max_s": max(values),
+            }
+
+        return {
+            "sesiones": self.sessions,
+            "interacciones_por_sesion": self.interactions,
+            "duracion_s": self.elapsed,
+            "ejecuciones_por_s": len(self.samples) / self.elapsed,
+            "latencias": latencies,
+            "memoria": {
+                "inicial_mb": self.memory[0] / 2**20,
+                "pico_mb": max(self.memory) / 2**20,
+                "final_mb": self.memory[-1] / 2**20,
+            },
+            "errores": self.errors,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prueba de carga con sesiones simultáneas de las páginas"
+    )
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--interactions", type=int, default=20)
+    parser.add_argument("--pages", nargs="+", default=list(PAGES), choices=PAGES)
+    parser.add_argument(
+        "--think-time", type=float, default=0.0, help="pausa media entre acciones (s)"
+    )
+    parser.add_argument(
+        "--ramp", type=float, default=0.0, help="segundos para iniciar las sesiones"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="archivo JSON para guardar el reporte")
+    args = parser.parse_args()
+
+    # advertencias que se repiten en cada sesión: el slider con valor en
+    # session_state y la creación de AppTest fuera del hilo principal
+    for name in (
+        "streamlit.elements.lib.policies",
+        "streamlit.runtime.scriptrunner_utils.script_run_context",
+    ):
+        logging.getLogger(name).addFilter(
+            lambda record: record.levelno >= logging.ERROR
+        )
+
+    test = LoadTest(
+        args.sessions,
+        args.interactions,
+        args.pages,
+        args.think_time,
+        args.ramp,
+        args.seed,
+    )
+    report = test.run()
+
+    print(
+        f"{report['sesiones']} sesiones, {len(test.samples)} ejecuciones en "
+        f"{report['duracion_s']:.1f} s ({report['ejecuciones_por_s']:.1f} por s)"
+    )
+    print(f"{'interacción':40s} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, values in report["latencias"].items():
+        print(
+            f"{name:40s} {values['n']:6d} "
+            + " ".join(
+                f"{values[key] * 1e3:7.0f}ms"
+                for key in ("p50_s", "p95_s", "p99_s", "max_s")
+            )
+        )
+    memory = report["memoria"]
+    print(
+        f"memoria: {memory['inicial_mb']:.0f} MB al inicio, "
+        f"{memory['pico_mb']:.0f} MB de pico, {memory['final_mb']:.0f} MB al final"
+    )
+    for error in report["errores"]:
+        print(f"ERROR {error}")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"Reporte guardado en {args.save}")
+
+    if report["errores"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+import numpy as np
+
+from bulkfunc import evaluate_states
+from parallelfunc import default_workers, evaluate_parallel
+
+# Escalamiento del evaluador en paralelo de 1 a N procesos.
+# Uso, desde la raíz del repositorio:
+#     python -m benchmarks.parallel_scaling --states 4000000 --max-workers 8
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Escalamiento del evaluador en paralelo de 1 a N procesos"
+    )
+    parser.add_argument("--states", type=int, default=4_000_000)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--max-workers", type=int, default=default_workers())
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    states = rng.uniform(-200.0, 200.0, (args.states, 3))
+    material = {"sigma_yield": 100.0, "sigma_u": 100.0}
+
+    start = time.perf_counter()
+    reference = evaluate_states(states[:, 0], states[:, 1], states[:, 2], **material)
+    serial = time.perf_counter() - start
+    print(f"{args.states:,} estados, bloques de {args.chunk_size:,} filas")
+    print(f"{'procesos':>9} {'tiempo (s)':>11} {'speedup':>8} {'filas/s':>14}")
+    print(f"{'serie':>9} {serial:11.3f} {1.0:8.2f} {args.states / serial:14,.0f}")
+
+    # 1, 2, 4, ... hasta max_workers
+    counts = sorted(
+        {2**i for i in range(args.max_workers.bit_length()) if 2**i <= args.max_workers}
+        | {args.max_workers}
+    )
+    for workers in counts:
+        best = np.inf
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = evaluate_parallel(states, workers, args.chunk_size, **material)
+            best = min(best, time.perf_counter() - start)
+
+        # el orden de salida debe ser el mismo que en serie
+        assert all(np.array_equal(results[name], reference[name]) for name in reference)
+        print(
+            f"{workers:9d} {best:11.3f} {serial / best:8.2f} "
+            f"{args.states / best:14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import time
+
+import numpy as np
+
+from stressfunc import (
+    rotate_tensors_2d,
+    rotate_tensors_3d,
+    stress_tensor_3d,
+    transform_stress,
+)
+
+# Rendimiento de la rotación de tensores por lotes contra el ciclo con
+# transform_stress, un elemento a la vez como en las páginas. Uso, desde la
+# raíz del repositorio:
+#     python -m benchmarks.rotation --elements 1000000
+
+
+def best_time(func, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rotación de tensores por lotes contra el ciclo escalar"
+    )
+    parser.add_argument("--elements", type=int, default=1_000_000)
+    parser.add_argument(
+        "--loop-elements",
+        type=int,
+        default=20_000,
+        help="elementos para medir los ciclos escalares, se extrapola al total",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    n = args.elements
+    sigma_x, sigma_y, tau_xy, theta = rng.uniform(-200.0, 200.0, (4, n))
+    tensors_2d = np.stack(
+        [np.stack([sigma_x, tau_xy], -1), np.stack([tau_xy, sigma_y], -1)], -2
+    )
+    tensors_3d = stress_tensor_3d(*rng.uniform(-200.0, 200.0, (6, n)))
+    # rotaciones aleatorias, una por elemento
+    rotations = np.linalg.qr(rng.normal(size=(n, 3, 3)))[0]
+
+    m = min(args.loop_elements, n)
+    values = list(zip(sigma_x[:m].tolist(), sigma_y[:m].tolist(), tau_xy[:m].tolist()))
+    angles = theta[:m].tolist()
+
+    def loop_2d():
+        for (sx, sy, txy), angle in zip(values, angles):
+            transform_stress(sx, sy, txy, angle)
+
+    def loop_3d():
+        for i in range(m):
+            rotations[i] @ tensors_3d[i] @ rotations[i].T
+
+    out_2d = np.empty_like(tensors_2d)
+    out_3d = np.empty_like(tensors_3d)
+    cases = [
+        ("2D ciclo transform_stress", loop_2d, m),
+        (
+            "2D transform_stress vectorizada",
+            lambda: transform_stress(sigma_x, sigma_y, tau_xy, theta),
+            n,
+        ),
+        (
+            "2D rotate_tensors_2d",
+            lambda: rotate_tensors_2d(tensors_2d, theta, out_2d),
+            n,
+        ),
+        ("3D ciclo R @ T @ R.T", loop_3d, m),
+        (
+            "3D rotate_tensors_3d",
+            lambda: rotate_tensors_3d(tensors_3d, rotations, out_3d),
+            n,
+        ),
+    ]
+
+    # la referencia de cada dimensión es su ciclo escalar
+    print(f"{n:,} elementos (ciclos medidos con {m:,} y extrapolados)")
+    print(f"{'caso':34s} {'tiempo (s)':>11} {'elementos/s':>14} {'speedup':>9}")
+    reference = None
+    for name, func, count in cases:
+        rate = count / best_time(func, args.repeat)
+        if "ciclo" in name:
+            reference = rate
+        print(f"{name:34s} {n / rate:11.3f} {rate:14,.0f} {rate / reference:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import io
+import logging
+import os
+import shutil
+import tempfile
+
+import streamlit as st
+from bulkfunc import evaluate_csv, evaluate_npy
+
+logger = logging.getLogger("solidlab.bulk")
+
+NOMBRES_CRITERIOS = {
+    "tresca": "Tresca",
+    "von_mises": "von Mises",
+    "rankine": "Rankine",
+    "mohr": "Mohr",
+}
+
+st.title("Análisis masivo de esfuerzos")
+st.set_page_config(page_title="Análisis masivo de esfuerzos", layout=None)
+
+materiales = ["Dúctil", "Frágil - Rankine", "Frágil - Mohr"]
+
+with st.container(border=True):
+    st.write(
+        "Cargue un archivo CSV con columnas $\sigma_{x}$, $\sigma_{y}$, $\\tau_{xy}$, "
+        "o un arreglo .npy de forma (N, 3). "
+        "El archivo subido se guarda completo en la memoria del servidor antes "
+        "de procesarlo por bloques, así que el tamaño está limitado. Para "
+        "archivos grandes use `cli.py`, que los lee por bloques desde el disco."
+    )
+    col1, col2, col3 = st.columns(3)
+    with col3:
+        seleccion_material = st.radio("Tipo de material", options=materiales)
+
+    material = {}
+    if seleccion_material == "Dúctil":
+        with col1:
+            material["sigma_yield"] = st.number_input(
+                "$\sigma_{YP}$", value=100.0, step=1.0
+            )
+    elif seleccion_material == "Frágil - Mohr":
+        with col1:
+            material["sigma_ut"] = st.number_input(
+                "$\sigma_{UT}$", value=100.0, step=1.0
+            )
+        with col2:
+            material["sigma_uc"] = st.number_input(
+                "$\sigma_{UC}$", value=200.0, step=1.0
+            )
+    else:
+        with col1:
+            material["sigma_u"] = st.number_input("$\sigma_{U}$", value=100.0, step=1.0)
+
+    chunk_size = st.number_input(
+        "Filas por bloque", min_value=1_000, value=100_000, step=10_000
+    )
+
+    archivo = st.file_uploader("Archivo CSV o NPY", type=["csv", "txt", "npy"])
+    # la página solo lee archivos subidos, nunca rutas del servidor. Los .npy
+    # se copian a un temporal para leerlos con mmap y los resultados se
+    # escriben a otro .npy temporal que se descarga
+    es_npy = archivo is not None and archivo.name.endswith(".npy")
+    procesar = st.button("Procesar", disabled=archivo is None)
+
+if procesar:
+    progreso = st.empty()
+    resumen = st.empty()
+
+    def mostrar_resumen(summary):
+        progreso.write(f"Estados procesados: {summary.count:,}")
+        with resumen.container(border=True):
+            cols = st.columns(len(summary.min_fs))
+            for col, name in zip(cols, summary.min_fs):
+                with col:
+                    st.subheader(NOMBRES_CRITERIOS[name])
+                    st.metric("$FS_{min}$", f"{summary.min_fs[name]:.2f}")
+                    st.metric("Puntos en falla", f"{summary.failing[name]:,}")
+                    sigma_x, sigma_y, tau_xy = summary.worst_state[name]
+                    st.write(
+                        f"Peor estado (fila {summary.worst_index[name]:,}): "
+                        f"$\sigma_{{x}}$ = {sigma_x:.2f}, "
+                        f"$\sigma_{{y}}$ = {sigma_y:.2f}, "
+                        f"$\\tau_{{xy}}$ = {tau_xy:.2f}"
+                    )
+
+    ruta_entrada = ruta_salida = None
+    try:
+        if es_npy:
+            entrada, ruta_entrada = tempfile.mkstemp(suffix=".npy")
+            with os.fdopen(entrada, "wb") as copia:
+                shutil.copyfileobj(archivo, copia)
+            salida, ruta_salida = tempfile.mkstemp(suffix="-resultados.npy")
+            os.close(salida)
+            summary = evaluate_npy(
+                ruta_entrada,
+                ruta_salida,
+                int(chunk_size),
+                on_block=mostrar_resumen,
+                **material,
+            )
+        else:
+            lineas = io.TextIOWrapper(archivo, encoding="utf-8")
+            summary = evaluate_csv(
+                lineas, int(chunk_size), on_chunk=mostrar_resumen, **material
+            )
+    except (OSError, ValueError):
+        # el detalle queda en el log del servidor, no en la página
+        logger.exception("No se pudo procesar %s", archivo.name)
+        st.error(
+            "No se pudo procesar el archivo: se esperaban tres columnas numéricas "
+            "($\\sigma_{x}$, $\\sigma_{y}$, $\\tau_{xy}$) o un arreglo .npy de "
+            "forma (N, 3)"
+        )
+    else:
+        if summary.count == 0:
+            st.warning("El archivo no contiene estados de esfuerzo")
+        else:
+            governing = summary.governing()
+            st.success(
+                f"Listo: {summary.count:,} estados. Criterio que gobierna: "
+                f"{NOMBRES_CRITERIOS[governing]} "
+                f"(FS = {summary.min_fs[governing]:.2f})"
+            )
+            if es_npy:
+                with open(ruta_salida, "rb") as resultados:
+                    st.download_button(
+                        "Descargar resultados (.npy)",
+                        resultados.read(),
+                        file_name="resultados.npy",
+                    )
+    finally:
+        # los temporales solo existen durante la ejecución
+        for temporal in (ruta_entrada, ruta_salida):
+            if temporal is not None and os.path.exists(temporal):
+                os.remove(temporal)
@@ -0,0 +1,382 @@
+import itertools
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from stressfunc import (
+    equivalent_stress_3d,
+    principal_stress_3d,
+    principal_stress_batch,
+    transform_stress,
+)
+from failurefunc import evaluate_criteria
+
+# En este módulo se definen funciones para evaluar muchos estados de esfuerzo
+# a la vez: esfuerzos principales, transformación y criterios de falla, por
+# bloques para que la memoria no dependa del tamaño de los datos
+
+
+PRINCIPAL_COLUMNS = (
+    "sigma_1",
+    "sigma_2",
+    "theta_1",
+    "theta_2",
+    "tau_max",
+    "sigma_tau",
+    "theta_tau",
+)
+TRANSFORMED_COLUMNS = ("sigma_x_prime", "sigma_y_prime", "tau_x_y_prime")
+STRAIN_PRINCIPAL_COLUMNS = (
+    "epsilon_1",
+    "epsilon_2",
+    "theta_1",
+    "theta_2",
+    "gamma_max",
+    "epsilon_gamma",
+    "theta_gamma",
+)
+STRAIN_TRANSFORMED_COLUMNS = ("epsilon_x_prime", "epsilon_y_prime", "gamma_x_y_prime")
+TENSOR_COLUMNS = (
+    "sigma_1",
+    "sigma_2",
+    "sigma_3",
+    "tau_max",
+    "von_mises",
+    "tresca",
+)
+
+# parámetros del material que necesita cada criterio
+CRITERIA = {
+    "tresca": ("sigma_yield",),
+    "von_mises": ("sigma_yield",),
+    "rankine": ("sigma_u",),
+    "mohr": ("sigma_uc", "sigma_ut"),
+}
+
+
+# Function to evaluate an array of (sigma_x, sigma_y, tau_xy) states.
+# Devuelve un diccionario ordenado de columnas: esfuerzos principales,
+# esfuerzos transformados (si se da theta) y fail_/fs_ por cada criterio
+def evaluate_states(sigma_x, sigma_y, tau_xy, theta=None, **material):
+    results = dict(
+        zip(PRINCIPAL_COLUMNS, principal_stress_batch(sigma_x, sigma_y, tau_xy))
+    )
+
+    if theta is not None:
+        results.update(
+            zip(TRANSFORMED_COLUMNS, transform_stress(sigma_x, sigma_y, tau_xy, theta))
+        )
+
+    criteria = evaluate_criteria(results["sigma_1"], results["sigma_2"], **material)
+    for name, (failure_bool, fs) in criteria.items():
+        results[f"fail_{name}"] = failure_bool
+        results[f"fs_{name}"] = fs
+
+    return results
+
+
+# Igual que evaluate_states para estados de deformación (epsilon_x, epsilon_y,
+# gamma_xy). Como en la página de deformaciones, se usa gamma_xy / 2 en las
+# ecuaciones y los cortantes resultantes se multiplican por dos
+def evaluate_strains(epsilon_x, epsilon_y, gamma_xy, theta=None):
+    principal = principal_stress_batch(epsilon_x, epsilon_y, gamma_xy / 2.0)
+    results = dict(zip(STRAIN_PRINCIPAL_COLUMNS, principal))
+    results["gamma_max"] = results["gamma_max"] * 2.0
+
+    if theta is not None:
+        transformed = transform_stress(epsilon_x, epsilon_y, gamma_xy / 2.0, theta)
+        results.update(zip(STRAIN_TRANSFORMED_COLUMNS, transformed))
+        results["gamma_x_y_prime"] = results["gamma_x_y_prime"] * 2.0
+
+    return results
+
+
+# Igual que evaluate_states para tensores 3D (sigma_x, sigma_y, sigma_z, tau_xy,
+# tau_yz, tau_xz): esfuerzos principales, cortante máximo absoluto, esfuerzos
+# equivalentes y fail_/fs_ por cada criterio con los tres principales
+def evaluate_tensors(
+    sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz, method="invariants", **material
+):
+    principal = principal_stress_3d(
+        sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz, method
+    )
+    results = dict(
+        zip(TENSOR_COLUMNS, principal + equivalent_stress_3d(*principal[:3]))
+    )
+
+    criteria = evaluate_criteria(
+        results["sigma_1"], results["sigma_2"], sigma3=results["sigma_3"], **material
+    )
+    for name, (failure_bool, fs) in criteria.items():
+        results[f"fail_{name}"] = failure_bool
+        results[f"fs_{name}"] = fs
+
+    return results
+
+
+# Parámetros del material para la lista de criterios, tomados de parameters.
+# Sin criteria se eligen todos los que tengan sus parámetros
+def criteria_material(criteria=None, **parameters):
+    given = {name for name, value in parameters.items() if value is not None}
+    if criteria is None:
+        criteria = [name for name, needed in CRITERIA.items() if given >= set(needed)]
+    material = {}
+    for name in criteria:
+        if name not in CRITERIA:
+            raise ValueError(f"Criterio desconocido: {name}")
+        missing = [p for p in CRITERIA[name] if p not in given]
+        if missing:
+            raise ValueError(f"El criterio {name} necesita {', '.join(missing)}")
+        material.update((p, float(parameters[p])) for p in CRITERIA[name])
+    return list(criteria), material
+
+
+# quita las columnas de los criterios que no se pidieron (evaluate_criteria
+# calcula Tresca y von Mises juntos)
+def drop_criteria(results, criteria):
+    for name in CRITERIA:
+        if name not in criteria:
+            results.pop(f"fail_{name}", None)
+            results.pop(f"fs_{name}", None)
+            results.pop(f"dist_{name}", None)
+    return results
+
+
+# Evalúa un bloque (N, 3) de esfuerzos o de deformaciones (strain=True), o un
+# bloque (N, 6) de tensores 3D (tensor=True)
+def evaluate_block(states, theta=None, strain=False, tensor=False, **material):
+    if tensor:
+        return evaluate_tensors(*states[:, :6].T, **material)
+    if strain:
+        return evaluate_strains(states[:, 0], states[:, 1], states[:, 2], theta)
+    return evaluate_states(states[:, 0], states[:, 1], states[:, 2], theta, **material)
+
+
+# lee un csv de texto por bloques de chunk_size filas, sin cargar todo el archivo.
+# Se omite la primera línea si no es numérica (encabezado)
+def iter_csv_chunks(lines, chunk_size=100_000, delimiter=",", columns=3):
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+
+    try:
+        float(first.split(delimiter)[0])
+        lines = itertools.chain([first], lines)
+    except ValueError:
+        pass
+
+    while True:
+        block = list(itertools.islice(lines, chunk_size))
+        if not block:
+            break
+        data = np.loadtxt(block, delimiter=delimiter, ndmin=2)
+        if data.size == 0:
+            continue
+        if data.shape[1] < columns:
+            raise ValueError(
+                f"Se esperaban {columns} columnas, se encontraron {data.shape[1]}"
+            )
+        yield data[:, :columns]
+
+
+# Resumen incremental de los resultados: se actualiza con cada bloque y solo
+# guarda contadores y el peor estado de cada criterio
+class StreamSummary:
+    def __init__(self):
+        self.count = 0
+        self.failing = {}
+        self.min_fs = {}
+        self.worst_index = {}
+        self.worst_state = {}
+
+    def update(self, states, results):
+        for key in results:
+            if not key.startswith("fs_"):
+                continue
+            name = key[3:]
+            fs = results[key]
+            failing = int(np.count_nonzero(results[f"fail_{name}"]))
+            self.failing[name] = self.failing.get(name, 0) + failing
+
+            i = int(np.argmin(fs))
+            if name not in self.min_fs or fs[i] < self.min_fs[name]:
+                self.min_fs[name] = float(fs[i])
+                self.worst_index[name] = self.count + i
+                self.worst_state[name] = tuple(float(v) for v in states[i])
+
+        self.count += len(states)
+
+    # agrega el resumen other de los estados que siguen a los ya contados
+    def merge(self, other):
+        for name, failing in other.failing.items():
+            self.failing[name] = self.failing.get(name, 0) + failing
+            if name not in self.min_fs or other.min_fs[name] < self.min_fs[name]:
+                self.min_fs[name] = other.min_fs[name]
+                self.worst_index[name] = self.count + other.worst_index[name]
+                self.worst_state[name] = other.worst_state[name]
+        self.count += other.count
+
+    # criterio con el menor factor de seguridad
+    def governing(self):
+        if not self.min_fs:
+            return None
+        return min(self.min_fs, key=self.min_fs.get)
+
+
+# procesa un archivo csv completo por bloques y devuelve el resumen.
+# on_chunk(summary) se llama al terminar cada bloque
+def evaluate_csv(lines, chunk_size=100_000, theta=None, on_chunk=None, **material):
+    summary = StreamSummary()
+    for states in iter_csv_chunks(lines, chunk_size):
+        results = evaluate_states(
+            states[:, 0], states[:, 1], states[:, 2], theta, **material
+        )
+        summary.update(states, results)
+        if on_chunk is not None:
+            on_chunk(summary)
+    return summary
+
+
+# tipo de dato del arreglo de resultados: un campo por columna de evaluate_states
+def result_dtype(theta=None, **material):
+    zero = np.zeros(1)
+    results = evaluate_states(zero, zero, zero, theta, **material)
+    return np.dtype([(name, values.dtype) for name, values in results.items()])
+
+
+# Evalúa un campo de esfuerzos guardado como .npy de forma (N, 3) sin cargarlo
+# en memoria: la entrada se abre con mmap y los resultados se escriben bloque a
+# bloque en un .npy estructurado (un campo por columna) también mapeado a disco
+def evaluate_npy(
+    in_path, out_path, block_size=500_000, theta=None, on_block=None, **material
+):
+    states = np.load(in_path, mmap_mode="r")
+    if states.ndim != 2 or states.shape[1] < 3:
+        raise ValueError(
+            f"Se esperaba un arreglo de forma (N, 3), se encontró {states.shape}"
+        )
+
+    n = states.shape[0]
+    out = np.lib.format.open_memmap(
+        out_path, mode="w+", dtype=result_dtype(theta, **material), shape=(n,)
+    )
+
+    summary = StreamSummary()
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = np.asarray(states[start:stop, :3], dtype=float)
+        results = evaluate_states(
+            block[:, 0], block[:, 1], block[:, 2], theta, **material
+        )
+        for name, values in results.items():
+            out[name][start:stop] = values
+        # se escriben a disco las páginas del bloque para no acumularlas en RAM
+        out.flush()
+        summary.update(block, results)
+        if on_block is not None:
+            on_block(summary)
+
+    del out
+    return summary
+
+
+# Escritores de resultados por bloques. write(results) recibe el diccionario de
+# columnas de un bloque y close() termina el archivo. Ninguno guarda los
+# bloques en memoria
+
+
+# csv de texto, con encabezado; los booleanos se escriben como 0/1.
+# path puede ser "-" para escribir a la salida estándar
+class CsvWriter:
+    def __init__(self, path, delimiter=","):
+        if path == "-":
+            self.file = sys.stdout
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline="")
+        self.delimiter = delimiter
+        self.header = False
+
+    def write(self, results):
+        names = list(results)
+        if not self.header:
+            self.file.write(self.delimiter.join(names) + "\n")
+            self.header = True
+        columns = np.column_stack([results[name] for name in names])
+        formats = ["%d" if results[name].dtype == bool else "%.10g" for name in names]
+        np.savetxt(self.file, columns, fmt=formats, delimiter=self.delimiter)
+
+    def close(self):
+        if self.file is sys.stdout:
+            self.file.flush()
+        else:
+            self.file.close()
+
+
+# .npy estructurado, un campo por columna como en evaluate_npy. El número de
+# filas no se conoce hasta el final: los datos se escriben a un archivo
+# temporal y al cerrar se escribe el encabezado seguido de los datos
+class NpyWriter:
+    def __init__(self, path):
+        self.path = path
+        self.dtype = None
+        self.count = 0
+        self._raw = open(path + ".tmp", "w+b")
+
+    def write(self, results):
+        if self.dtype is None:
+            self.dtype = np.dtype([(name, v.dtype) for name, v in results.items()])
+        block = np.empty(len(next(iter(results.values()))), dtype=self.dtype)
+        for name, values in results.items():
+            block[name] = values
+        block.tofile(self._raw)
+        self.count += len(block)
+
+    def close(self):
+        header = {
+            "descr": np.lib.format.dtype_to_descr(self.dtype or np.dtype(float)),
+            "fortran_order": False,
+            "shape": (self.count,),
+        }
+        self._raw.seek(0)
+        with open(self.path, "wb") as out:
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(self._raw, out, 2**22)
+        self._raw.close()
+        os.remove(self.path + ".tmp")
+
+
+# Parquet con pyarrow (dependencia opcional), un grupo de filas por bloque
+class ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ImportError("Para escribir Parquet se necesita pyarrow") from error
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self._writer = None
+
+    def write(self, results):
+        table = self.pa.table(results)
+        if self._writer is None:
+            self._writer = self.pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# formato de salida a partir de la extensión del archivo
+def output_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "pq":
+        return "parquet"
+    if extension not in ("csv", "npy", "parquet"):
+        raise ValueError(f"Formato de salida no reconocido: {path}")
+    return extension
@@ -0,0 +1,244 @@
+import numpy as np
+
+# En este módulo se define una versión interactiva del círculo de Mohr y del
+# elemento rotado con Vega-Lite (Altair). El círculo, la tabla de ángulos y la
+# geometría del elemento se envían una sola vez; el slider del ángulo es parte
+# del gráfico, por lo que al moverlo todo se recalcula en el navegador sin
+# volver a ejecutar la página
+
+# nombre del parámetro del ángulo dentro de las expresiones de Vega
+ANGLE = "angulo"
+
+
+# número para insertar en una expresión de Vega, entre paréntesis por el signo
+def _number(value):
+    return f"({float(value)!r})"
+
+
+def _mohr_layers(alt, pd, sigma_x, sigma_y, tau_xy, sweep, x_label, y_label):
+    center = (sigma_x + sigma_y) / 2
+    radius = np.sqrt(((sigma_x - sigma_y) / 2) ** 2 + tau_xy**2)
+    t = np.linspace(0, 2 * np.pi, 100)
+    circle = pd.DataFrame(
+        {
+            "i": np.arange(len(t)),
+            "x": center + radius * np.cos(t),
+            "y": radius * np.sin(t),
+        }
+    )
+
+    # tabla de ángulos cada 1°, tomada de la tabla de transform_sweep.
+    # Se cambia el signo del cortante igual que en el gráfico de matplotlib
+    angles, sigma_x_prime, _, tau_x_y_prime = sweep
+    every = max(1, int(round((len(angles) - 1) / 360)))
+    # los DataFrame se envían una sola vez en "datasets" aunque los usen varias
+    # capas del gráfico
+    table = pd.DataFrame(
+        {
+            "theta": angles[::every],
+            "x": sigma_x_prime[::every],
+            "y": -tau_x_y_prime[::every],
+        }
+    )
+
+    limit = max(abs(center) + radius, radius, 1e-9) * 1.1
+    x_scale = alt.Scale(domain=[center - limit, center + limit], nice=False)
+    y_scale = alt.Scale(domain=[-limit, limit], nice=False)
+    x = alt.X("x:Q", scale=x_scale, title=x_label)
+    y = alt.Y("y:Q", scale=y_scale, title=y_label)
+
+    base = alt.Chart(circle).mark_line(clip=True).encode(x=x, y=y, order="i:Q")
+    fixed = alt.Data(
+        values=[
+            {"x": float(sigma_x), "y": float(tau_xy), "color": "red"},
+            {"x": float(center), "y": 0.0, "color": "black"},
+        ]
+    )
+    points = (
+        alt.Chart(fixed)
+        .mark_point(filled=True, size=30)
+        .encode(x=x, y=y, color=alt.Color("color:N", scale=None))
+    )
+
+    # punto transformado: la fila de la tabla más cercana al ángulo del slider
+    current = alt.Chart(table).transform_filter(f"abs(datum.theta - {ANGLE}) < 0.5")
+    transformed = current.mark_point(filled=True, size=30, color="blue").encode(
+        x=x, y=y
+    )
+    line = current.mark_rule(color="blue").encode(
+        x=x,
+        y=y,
+        x2=alt.datum(float(sigma_x)),
+        y2=alt.datum(float(tau_xy)),
+    )
+    label = (
+        current.mark_text(align="left", dx=8, dy=-8, color="blue")
+        .encode(
+            x=x,
+            y=y,
+            text=alt.Text("label:N"),
+        )
+        .transform_calculate(
+            label=f"format({ANGLE}, '.0f') + '°: (' + format(datum.x, '.2f') + ', '"
+            " + format(datum.y, '.2f') + ')'"
+        )
+    )
+
+    return alt.layer(base, points, line, transformed, label)
+
+
+def _element_rows():
+    # caras del elemento, en grados desde la cara derecha
+    faces = {"right": 0.0, "top": 90.0, "left": 180.0, "bottom": 270.0}
+    rows = []
+    for face, angle in faces.items():
+        rows.append({"kind": "normal", "face": face, "angle": angle})
+        rows.append({"kind": "shear", "face": face, "angle": angle})
+    return rows
+
+
+def _element_layers(alt, sigma_x, sigma_y, tau_xy, max_normal, max_shear, factor):
+    c = _number((sigma_x + sigma_y) / 2)
+    d = _number((sigma_x - sigma_y) / 2)
+    tau = _number(tau_xy)
+    t = f"(2 * {ANGLE} * PI / 180)"
+    # esfuerzos transformados, mismas ecuaciones que transform_stress
+    sx = f"({c} + {d} * cos({t}) + {tau} * sin({t}))"
+    sy = f"({c} - {d} * cos({t}) - {tau} * sin({t}))"
+    txy = f"({_number(factor)} * (-{d} * sin({t}) + {tau} * cos({t})))"
+
+    # cuadrado y ejes x', y' en coordenadas locales, se rotan con el ángulo
+    outline = alt.Data(
+        values=[
+            {"i": i, "x": x, "y": y, "shape": "elemento"}
+            for i, (x, y) in enumerate([(-1, -1), (1, -1), (1, 1), (-1, 1), (-1, -1)])
+        ]
+        + [
+            {"i": i, "x": x, "y": y, "shape": "ejes"}
+            for i, (x, y) in enumerate([(2, 0), (0, 0), (0, 2)])
+        ]
+    )
+    rotate = {
+        "xr": f"datum.x * cos({ANGLE} * PI / 180) - datum.y * sin({ANGLE} * PI / 180)",
+        "yr": f"datum.x * sin({ANGLE} * PI / 180) + datum.y * cos({ANGLE} * PI / 180)",
+    }
+    scale = alt.Scale(domain=[-2, 2], nice=False)
+    x = alt.X("xr:Q", scale=scale, axis=None)
+    y = alt.Y("yr:Q", scale=scale, axis=None)
+
+    square = (
+        alt.Chart(outline)
+        .transform_calculate(**rotate)
+        .mark_line()
+        .encode(
+            x=x,
+            y=y,
+            order="i:Q",
+            detail="shape:N",
+            color=alt.Color(
+                "shape:N",
+                scale=alt.Scale(domain=["elemento", "ejes"], range=["#1f77b4", "red"]),
+                legend=None,
+            ),
+        )
+    )
+
+    # Flechas, misma geometría que draw_stress: se definen sobre la cara
+    # derecha y se rotan theta más el ángulo de la cara
+    arrows = alt.Chart(alt.Data(values=_element_rows()))
+    arrows = arrows.transform_calculate(
+        value=f"datum.kind == 'normal' ? "
+        f"(datum.face == 'right' || datum.face == 'left' ? {sx} : {sy}) : {txy}"
+    ).transform_filter("abs(datum.value) >= 0.05")
+    arrows = (
+        arrows.transform_calculate(
+            length=f"datum.kind == 'normal' ? abs(datum.value) * 0.5 / {_number(max_normal)}"
+            f" : abs(datum.value) * 1.5 / {_number(max_shear)}",
+            sign="datum.kind == 'shear' && (datum.face == 'top' || datum.face == 'bottom')"
+            " ? -(datum.value > 0 ? 1 : -1) : (datum.value > 0 ? 1 : -1)",
+        )
+        .transform_calculate(
+            x0="datum.kind == 'normal' ? 1.2 + (datum.sign > 0 ? 0 : datum.length) : 1.1",
+            y0="datum.kind == 'normal' ? 0 : -datum.sign * datum.length / 2",
+            x1="datum.kind == 'normal' ? 1.2 + (datum.sign > 0 ? datum.length : 0) : 1.1",
+            y1="datum.kind == 'normal' ? 0 : datum.sign * datum.length / 2",
+            rot=f"({ANGLE} + datum.angle) * PI / 180",
+        )
+        .transform_calculate(
+            xr="datum.x0 * cos(datum.rot) - datum.y0 * sin(datum.rot)",
+            yr="datum.x0 * sin(datum.rot) + datum.y0 * cos(datum.rot)",
+            xr2="datum.x1 * cos(datum.rot) - datum.y1 * sin(datum.rot)",
+            yr2="datum.x1 * sin(datum.rot) + datum.y1 * cos(datum.rot)",
+            xt="(datum.x1 + 0.1) * cos(datum.rot) - (datum.y1 + 0.1) * sin(datum.rot)",
+            yt="(datum.x1 + 0.1) * sin(datum.rot) + (datum.y1 + 0.1) * cos(datum.rot)",
+        )
+        .transform_calculate(
+            # ángulo de la punta en grados, en sentido horario desde arriba
+            heading="atan2(datum.xr2 - datum.xr, datum.yr2 - datum.yr) * 180 / PI",
+            text="format(datum.value, '.2f')",
+        )
+    )
+
+    shafts = arrows.mark_rule(color="black", strokeWidth=2).encode(
+        x=x, y=y, x2="xr2:Q", y2="yr2:Q"
+    )
+    heads = arrows.mark_point(
+        shape="triangle-up", filled=True, size=60, color="black", opacity=1
+    ).encode(
+        x=alt.X("xr2:Q", scale=scale, axis=None),
+        y=alt.Y("yr2:Q", scale=scale, axis=None),
+        angle=alt.Angle("heading:Q", scale=None),
+    )
+    texts = arrows.mark_text(fontSize=11).encode(
+        x=alt.X("xt:Q", scale=scale, axis=None),
+        y=alt.Y("yt:Q", scale=scale, axis=None),
+        text="text:N",
+    )
+
+    return alt.layer(square, shafts, heads, texts)
+
+
+# Gráfico interactivo con el círculo de Mohr y el elemento rotado, ambos
+# controlados por un slider de ángulo dentro del gráfico.
+# sweep es la tabla de transform_sweep para (sigma_x, sigma_y, tau_xy);
+# shear_factor multiplica el cortante que se muestra en el elemento (2.0 para
+# deformaciones, donde el círculo usa gamma/2)
+def mohr_element_chart(
+    sigma_x,
+    sigma_y,
+    tau_xy,
+    sweep,
+    theta,
+    max_normal,
+    max_shear,
+    x_label,
+    y_label,
+    shear_factor=1.0,
+    size=360,
+):
+    import altair as alt
+    import pandas as pd
+
+    angle = alt.param(
+        name=ANGLE,
+        value=float(theta),
+        bind=alt.binding_range(min=-180, max=180, step=1, name="Ángulo θ "),
+    )
+    mohr = _mohr_layers(alt, pd, sigma_x, sigma_y, tau_xy, sweep, x_label, y_label)
+    element = _element_layers(
+        alt,
+        sigma_x,
+        sigma_y,
+        tau_xy,
+        max(max_normal, 1e-9),
+        max(max_shear, 1e-9),
+        shear_factor,
+    )
+    return (
+        alt.vconcat(
+            mohr.properties(width=size, height=size),
+            element.properties(width=size, height=size),
+        )
+        .add_params(angle)
+        .configure_view(strokeWidth=0)
+    )
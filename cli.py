@@ -0,0 +1,294 @@
+import argparse
+import functools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bulkfunc import (
+    CRITERIA,
+    CsvWriter,
+    NpyWriter,
+    ParquetWriter,
+    criteria_material,
+    drop_criteria,
+    evaluate_block,
+    iter_csv_chunks,
+    output_format,
+)
+from constitutivefunc import PLANES, evaluate_elastic, isotropic, orthotropic
+from distancefunc import evaluate_with_distances
+from parallelfunc import evaluate_blocks
+from rosettefunc import Rosette, gauge_columns_for, reduce_block
+
+# Análisis por lotes desde la línea de comandos, sin Streamlit ni matplotlib.
+# Lee estados de esfuerzo (sigma_x, sigma_y, tau_xy), de deformación
+# (epsilon_x, epsilon_y, gamma_xy), lecturas de rosetas o tensores 3D de seis
+# componentes de archivos .csv/.npy o de la entrada estándar, calcula los
+# valores principales, la transformación a un ángulo y los criterios de falla
+# elegidos, y escribe los resultados en CSV, NPY o Parquet. Las deformaciones
+# se pueden convertir a esfuerzos con un material elástico, y a los esfuerzos
+# planos se les puede agregar la distancia a cada envolvente. Ejemplos:
+#     python cli.py estados.csv --sigma-yield 250 -o resultados.parquet
+#     cat estados.csv | python cli.py --criteria mohr --sigma-ut 100 --sigma-uc 200
+#     python cli.py deformaciones.npy --strain --theta 30 -o resultados.npy
+#     python cli.py tensores.npy --3d --sigma-yield 250 -o resultados.parquet
+#     python cli.py registro.csv --rosette 0 45 90 --time-column 0 -o roseta.npy
+#     python cli.py campo.npy --elastic 200e3 0.3 --plane strain --sigma-yield 250
+#     python cli.py estados.npy --distance --sigma-yield 250 -o distancias.npy
+
+
+# bloques (N, columns) de una entrada: "-" es la entrada estándar en csv
+def read_blocks(path, chunk_size, delimiter, columns=3):
+    if path == "-":
+        yield from iter_csv_chunks(sys.stdin, chunk_size, delimiter, columns)
+    elif path.endswith(".npy"):
+        states = np.load(path, mmap_mode="r")
+        if states.ndim != 2 or states.shape[1] < columns:
+            raise ValueError(
+                f"{path}: se esperaba un arreglo de forma (N, {columns}), "
+                f"se encontró {states.shape}"
+            )
+        for start in range(0, states.shape[0], chunk_size):
+            yield np.asarray(states[start : start + chunk_size, :columns], dtype=float)
+    else:
+        with open(path, encoding="utf-8") as lines:
+            yield from iter_csv_chunks(lines, chunk_size, delimiter, columns)
+
+
+def open_writer(path, fmt, delimiter):
+    if fmt == "csv":
+        return CsvWriter(path, delimiter)
+    if fmt == "npy":
+        return NpyWriter(path)
+    return ParquetWriter(path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Esfuerzos principales, transformación y criterios de falla "
+        "por lotes, sin interfaz gráfica"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        help="archivos .csv o .npy con tres columnas; - o nada lee csv de stdin",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="archivo de salida; - escribe csv a stdout"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "npy", "parquet"],
+        help="formato de salida, por defecto según la extensión",
+    )
+    parser.add_argument(
+        "--strain",
+        action="store_true",
+        help="las entradas son deformaciones (epsilon_x, epsilon_y, gamma_xy)",
+    )
+    parser.add_argument(
+        "--3d",
+        dest="tensor",
+        action="store_true",
+        help="las entradas son tensores 3D de seis columnas (sigma_x, sigma_y, "
+        "sigma_z, tau_xy, tau_yz, tau_xz)",
+    )
+    parser.add_argument(
+        "--rosette",
+        type=float,
+        nargs="+",
+        metavar="ANGULO",
+        help="las entradas son lecturas de una roseta con galgas a estos ángulos "
+        "(°), por ejemplo 0 45 90; con más de tres se ajusta por mínimos cuadrados",
+    )
+    parser.add_argument(
+        "--gauge-columns",
+        type=int,
+        nargs="+",
+        help="columnas de las galgas (desde 0), por defecto seguidas",
+    )
+    parser.add_argument(
+        "--time-column", type=int, help="columna de tiempo que se copia a la salida"
+    )
+    parser.add_argument(
+        "--elastic",
+        type=float,
+        nargs=2,
+        metavar=("E", "NU"),
+        help="las entradas son deformaciones y se convierten a esfuerzos con un "
+        "material isótropo",
+    )
+    parser.add_argument(
+        "--orthotropic",
+        type=float,
+        nargs=4,
+        metavar=("E1", "E2", "NU12", "G12"),
+        help="como --elastic, con un material ortótropo (lámina)",
+    )
+    parser.add_argument(
+        "--ply-angle",
+        type=float,
+        default=0.0,
+        help="ángulo de las fibras del material ortótropo respecto a x (°)",
+    )
+    parser.add_argument(
+        "--plane",
+        choices=PLANES,
+        default="stress",
+        help="esfuerzo plano o deformación plana para --elastic/--orthotropic",
+    )
+    parser.add_argument("--theta", type=float, help="ángulo de transformación (°)")
+    parser.add_argument(
+        "--criteria",
+        nargs="+",
+        choices=list(CRITERIA),
+        help="criterios de falla, por defecto todos los que tengan sus parámetros",
+    )
+    parser.add_argument(
+        "--distance",
+        action="store_true",
+        help="agrega dist_<criterio>, la distancia de cada estado a la envolvente "
+        "(positiva dentro, negativa fuera), solo para esfuerzo plano",
+    )
+    parser.add_argument("--sigma-yield", type=float)
+    parser.add_argument("--sigma-u", type=float)
+    parser.add_argument("--sigma-uc", type=float)
+    parser.add_argument("--sigma-ut", type=float)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="no reportar el rendimiento"
+    )
+    args = parser.parse_args(argv)
+
+    if args.tensor and (args.strain or args.theta is not None):
+        parser.error("--3d no se puede combinar con --strain ni con --theta")
+    args.elastic_material = None
+    if args.elastic is not None or args.orthotropic is not None:
+        if args.elastic is not None and args.orthotropic is not None:
+            parser.error("--elastic y --orthotropic son excluyentes")
+        if args.tensor or args.strain or args.rosette is not None:
+            parser.error(
+                "--elastic/--orthotropic ya leen deformaciones, no se combinan con "
+                "--3d, --strain ni --rosette"
+            )
+        try:
+            if args.elastic is not None:
+                args.elastic_material = isotropic(*args.elastic, plane=args.plane)
+            else:
+                args.elastic_material = orthotropic(
+                    *args.orthotropic, angle=args.ply_angle, plane=args.plane
+                )
+        except ValueError as error:
+            parser.error(str(error))
+    if args.rosette is not None:
+        if args.tensor:
+            parser.error("--rosette no se puede combinar con --3d")
+        # las rosetas miden deformaciones
+        args.strain = True
+        try:
+            args.rosette = Rosette(args.rosette)
+            args.gauge_columns = gauge_columns_for(
+                args.rosette, args.gauge_columns, args.time_column
+            )
+        except ValueError as error:
+            parser.error(str(error))
+    if args.strain and args.criteria:
+        parser.error("los criterios de falla solo se aplican a esfuerzos")
+    plane_strain = (
+        args.elastic_material is not None and args.elastic_material.plane == "strain"
+    )
+    if args.distance and (args.strain or args.tensor or plane_strain):
+        parser.error(
+            "--distance solo se aplica a esfuerzo plano, no a --strain, --rosette, "
+            "--3d ni --plane strain"
+        )
+    try:
+        args.criteria, args.material = criteria_material(
+            [] if args.strain else args.criteria,
+            sigma_yield=args.sigma_yield,
+            sigma_u=args.sigma_u,
+            sigma_uc=args.sigma_uc,
+            sigma_ut=args.sigma_ut,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.format is None:
+        try:
+            args.format = "csv" if args.output == "-" else output_format(args.output)
+        except ValueError as error:
+            parser.error(str(error))
+    if args.format != "csv" and args.output == "-":
+        parser.error(f"el formato {args.format} necesita un archivo de salida (-o)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.rosette is not None:
+        evaluate = functools.partial(
+            reduce_block,
+            rosette=args.rosette,
+            gauge_columns=args.gauge_columns,
+            time_column=args.time_column,
+            theta=args.theta,
+        )
+        used = args.gauge_columns + [args.time_column or 0]
+        columns = max(used) + 1
+    elif args.elastic_material is not None:
+        evaluate = functools.partial(
+            evaluate_elastic,
+            elastic=args.elastic_material,
+            theta=args.theta,
+            **args.material,
+        )
+        columns = 3
+    else:
+        evaluate = functools.partial(
+            evaluate_block,
+            theta=args.theta,
+            strain=args.strain,
+            tensor=args.tensor,
+            **args.material,
+        )
+        columns = 6 if args.tensor else 3
+    if args.distance:
+        evaluate = functools.partial(
+            evaluate_with_distances, evaluate=evaluate, **args.material
+        )
+
+    blocks = (
+        block
+        for path in args.inputs
+        for block in read_blocks(path, args.chunk_size, args.delimiter, columns)
+    )
+    writer = open_writer(args.output, args.format, args.delimiter)
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for results in evaluate_blocks(blocks, evaluate, executor, 2 * args.workers):
+            writer.write(drop_criteria(results, args.criteria))
+            rows += len(next(iter(results.values())))
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        print(
+            f"{rows:,} filas en {elapsed:.3f} s "
+            f"({rows / max(elapsed, 1e-9):,.0f} filas/s)",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
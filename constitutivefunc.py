@@ -0,0 +1,208 @@
+import numpy as np
+
+from bulkfunc import PRINCIPAL_COLUMNS, TRANSFORMED_COLUMNS
+from failurefunc import evaluate_criteria
+from stressfunc import principal_stress_batch, transform_stress
+
+# En este módulo se convierten deformaciones (epsilon_x, epsilon_y, gamma_xy)
+# en esfuerzos con la ley de Hooke, en esfuerzo plano o en deformación plana,
+# para materiales isótropos y ortótropos (láminas con las fibras a un ángulo).
+# Los esfuerzos quedan en las unidades de los módulos; las deformaciones son
+# adimensionales y gamma_xy es la deformación cortante de ingeniería
+
+STRESS_COLUMNS = ("sigma_x", "sigma_y", "tau_xy")
+PLANES = ("stress", "strain")
+
+
+# Matriz (3, 3) de transform_stress: (sigma_x', sigma_y', tau_xy') =
+# T (sigma_x, sigma_y, tau_xy). Para las deformaciones de ingeniería la matriz
+# es T(-theta)^T
+def _stress_rotation(theta):
+    theta_rad = np.radians(theta)
+    c = np.cos(theta_rad)
+    s = np.sin(theta_rad)
+    return np.array(
+        [
+            [c * c, s * s, 2 * c * s],
+            [s * s, c * c, -2 * c * s],
+            [-c * s, c * s, c * c - s * s],
+        ]
+    )
+
+
+# Matriz de rigidez (3, 3) en los ejes del material, de (epsilon_1, epsilon_2,
+# gamma_12) a (sigma_1, sigma_2, tau_12), y la fila (3,) que da sigma_3 en
+# deformación plana (None en esfuerzo plano, donde sigma_3 = 0). Deformación
+# plana necesita además E3, nu13 y nu23; por defecto E3 = E2, nu13 = nu12 y
+# nu23 = nu12
+def stiffness_matrix(E1, E2, nu12, G12, plane="stress", E3=None, nu13=None, nu23=None):
+    if plane not in PLANES:
+        raise ValueError(f"plane debe ser 'stress' o 'strain', se dio {plane!r}")
+    E3 = E2 if E3 is None else E3
+    nu13 = nu12 if nu13 is None else nu13
+    nu23 = nu12 if nu23 is None else nu23
+    if min(E1, E2, E3, G12) <= 0:
+        raise ValueError("Los módulos de elasticidad y de cortante deben ser positivos")
+
+    compliance = np.array(
+        [
+            [1 / E1, -nu12 / E1, -nu13 / E1],
+            [-nu12 / E1, 1 / E2, -nu23 / E2],
+            [-nu13 / E1, -nu23 / E2, 1 / E3],
+        ]
+    )
+    # la estabilidad del material es en 3D, también para esfuerzo plano
+    if np.linalg.eigvalsh(compliance).min() <= 0:
+        raise ValueError(
+            "Las relaciones de Poisson no dan un material estable "
+            f"(nu12={nu12}, nu13={nu13}, nu23={nu23})"
+        )
+
+    stiffness = np.zeros((3, 3))
+    stiffness[2, 2] = G12
+    if plane == "stress":
+        stiffness[:2, :2] = np.linalg.inv(compliance[:2, :2])
+        return stiffness, None
+    full = np.linalg.inv(compliance)
+    stiffness[:2, :2] = full[:2, :2]
+    return stiffness, np.array([full[2, 0], full[2, 1], 0.0])
+
+
+# Rigidez en los ejes globales de una lámina con las fibras a angle (°) del
+# eje x: Q' = T(-angle) Q T(-angle)^T. Con out_of_plane también se rota la
+# fila de sigma_3
+def rotate_stiffness(stiffness, angle, out_of_plane=None):
+    rotation = _stress_rotation(-angle)
+    rotated = rotation @ stiffness @ rotation.T
+    if out_of_plane is None:
+        return rotated, None
+    return rotated, rotation @ out_of_plane
+
+
+# Material elástico lineal. angle es el ángulo de las fibras (°): un escalar
+# para todo el campo, o un arreglo con un ángulo por elemento. Con un solo
+# ángulo la rigidez se rota una vez y cada bloque es un producto de matrices;
+# con un ángulo por elemento las deformaciones se llevan a los ejes del
+# material y los esfuerzos de regreso con transform_stress
+class Elastic:
+    def __init__(self, stiffness, out_of_plane=None, angle=0.0):
+        self.stiffness = np.asarray(stiffness, dtype=float)
+        self.out_of_plane = (
+            None if out_of_plane is None else np.asarray(out_of_plane, dtype=float)
+        )
+        self.angle = angle
+        self.per_element = np.ndim(angle) > 0
+        if self.per_element:
+            self.angle = np.asarray(angle, dtype=float)
+        else:
+            self.global_stiffness, self.global_out_of_plane = rotate_stiffness(
+                self.stiffness, float(angle), self.out_of_plane
+            )
+
+    @property
+    def plane(self):
+        return "stress" if self.out_of_plane is None else "strain"
+
+    # el mismo material para las filas start:stop de un campo
+    def block(self, start, stop):
+        if not self.per_element:
+            return self
+        return Elastic(self.stiffness, self.out_of_plane, self.angle[start:stop])
+
+    # strains: arreglo (N, 3) de (epsilon_x, epsilon_y, gamma_xy). Devuelve
+    # (sigma_x, sigma_y, tau_xy, sigma_z), con sigma_z = None en esfuerzo plano
+    def stresses(self, strains):
+        strains = np.asarray(strains, dtype=float)
+        if not self.per_element:
+            # (3, N): cada componente queda contigua en memoria
+            sigma_x, sigma_y, tau_xy = self.global_stiffness @ strains.T
+            sigma_z = None
+            if self.global_out_of_plane is not None:
+                sigma_z = strains @ self.global_out_of_plane
+            return sigma_x, sigma_y, tau_xy, sigma_z
+
+        if len(self.angle) != len(strains):
+            raise ValueError(
+                f"Se dieron {len(self.angle)} ángulos para {len(strains)} elementos"
+            )
+        epsilon_1, epsilon_2, half_gamma = transform_stress(
+            strains[:, 0], strains[:, 1], strains[:, 2] / 2.0, self.angle
+        )
+        local = (epsilon_1, epsilon_2, 2.0 * half_gamma)
+        q = self.stiffness
+        sigma_1 = q[0, 0] * local[0] + q[0, 1] * local[1]
+        sigma_2 = q[1, 0] * local[0] + q[1, 1] * local[1]
+        tau_12 = q[2, 2] * local[2]
+        sigma_z = None
+        if self.out_of_plane is not None:
+            row = self.out_of_plane
+            sigma_z = row[0] * local[0] + row[1] * local[1]
+        sigma_x, sigma_y, tau_xy = transform_stress(
+            sigma_1, sigma_2, tau_12, -self.angle
+        )
+        return sigma_x, sigma_y, tau_xy, sigma_z
+
+
+def isotropic(E, nu, plane="stress"):
+    return Elastic(*stiffness_matrix(E, E, nu, E / (2 * (1 + nu)), plane))
+
+
+def orthotropic(
+    E1, E2, nu12, G12, angle=0.0, plane="stress", E3=None, nu13=None, nu23=None
+):
+    stiffness, out_of_plane = stiffness_matrix(E1, E2, nu12, G12, plane, E3, nu13, nu23)
+    return Elastic(stiffness, out_of_plane, angle)
+
+
+# Resultados de un bloque (N, 3) de deformaciones: esfuerzos, sigma_z (en
+# deformación plana), las columnas de evaluate_states y fail_/fs_ por cada
+# criterio. En deformación plana los criterios usan los tres esfuerzos
+# principales
+def evaluate_elastic(strains, elastic, theta=None, **material):
+    sigma_x, sigma_y, tau_xy, sigma_z = elastic.stresses(strains)
+    results = dict(zip(STRESS_COLUMNS, (sigma_x, sigma_y, tau_xy)))
+    if sigma_z is not None:
+        results["sigma_z"] = sigma_z
+    results.update(
+        zip(PRINCIPAL_COLUMNS, principal_stress_batch(sigma_x, sigma_y, tau_xy))
+    )
+
+    if theta is not None:
+        results.update(
+            zip(TRANSFORMED_COLUMNS, transform_stress(sigma_x, sigma_y, tau_xy, theta))
+        )
+
+    criteria = evaluate_criteria(
+        results["sigma_1"], results["sigma_2"], sigma3=sigma_z, **material
+    )
+    for name, (failure_bool, fs) in criteria.items():
+        results[f"fail_{name}"] = failure_bool
+        results[f"fs_{name}"] = fs
+
+    return results
+
+
+# Evalúa un campo completo de deformaciones (N, 3) por bloques de chunk_size
+# filas. Los esfuerzos y demás intermedios solo existen para un bloque a la vez
+# y cada resultado se copia a su columna de salida, que se reserva una sola
+# vez. columns elige las columnas que se guardan (por defecto todas)
+def evaluate_elastic_field(
+    strains, elastic, theta=None, chunk_size=65_536, columns=None, **material
+):
+    strains = np.asarray(strains, dtype=float)
+    n = len(strains)
+    out = None
+    for start in range(0, max(n, 1), chunk_size):
+        stop = min(start + chunk_size, n)
+        results = evaluate_elastic(
+            strains[start:stop], elastic.block(start, stop), theta, **material
+        )
+        if out is None:
+            names = list(results) if columns is None else list(columns)
+            unknown = [name for name in names if name not in results]
+            if unknown:
+                raise ValueError(f"Columnas desconocidas: {', '.join(unknown)}")
+            out = {name: np.empty(n, dtype=results[name].dtype) for name in names}
+        for name, values in out.items():
+            values[start:stop] = results[name]
+    return out
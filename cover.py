@@ -15,6 +15,8 @@ st.markdown(
     - Transformación de esfuerzos y círculo de Mohr
     - Transformación de deformaciones y círculo de Mohr
     - Criterios de falla de Tresca, von Mises, Rankine y Mohr
+    - Análisis masivo de estados de esfuerzo desde archivos CSV
+    - Barrido de cargas para encontrar la combinación con menor factor de seguridad
 
     Hecho por [Alejandro Garro Espinoza](https://www.linkedin.com/in/alejandro-garro-a7a679a8/).  
     *¿Sugerencias? [alejandro.garro@ucr.ac.cr](mailto:alejandro.garro@ucr.ac.cr).*
@@ -0,0 +1,314 @@
+import functools
+
+import numpy as np
+
+from bulkfunc import CRITERIA
+from envelopefunc import criterion_fs, trace_envelope
+
+# En este módulo se calcula la distancia de cada estado (sigma1, sigma2) a la
+# envolvente de falla de un criterio, con signo: positiva dentro de la
+# envolvente (margen hasta la falla) y negativa fuera. A diferencia del FS,
+# que compara sobre el rayo desde el origen, es la distancia más corta a la
+# frontera en el plano de esfuerzos.
+# Tresca, Rankine y Mohr tienen envolventes formadas por segmentos y rayos, y
+# von Mises es una elipse; todas se resuelven en forma cerrada o con una
+# iteración de Newton vectorizada. Para otras envolventes (por ejemplo las
+# trazadas con envelopefunc) se usa PolygonIndex, un índice de malla sobre
+# los lados del polígono
+
+# tamaño de bloque para no crear arreglos (N, lados) de todo el lote
+CHUNK_SIZE = 262_144
+# pares (punto, lado) que PolygonIndex compara a la vez
+PAIRS = 1_048_576
+# polígonos con hasta tantos lados se comparan con todos, sin malla
+SMALL_POLYGON = 32
+
+
+# Distancia de los puntos (x, y) a los segmentos (o rayos, con end = inf) que
+# empiezan en los puntos start con dirección direction, uno a la vez para no
+# crear arreglos (N, lados)
+def _segment_distance(x, y, start, direction, end=1.0):
+    nearest = np.full(np.shape(x), np.inf)
+    for (x0, y0), (dx, dy) in zip(start, direction):
+        t = np.clip(((x - x0) * dx + (y - y0) * dy) / (dx * dx + dy * dy), 0.0, end)
+        np.minimum(nearest, (x - x0 - t * dx) ** 2 + (y - y0 - t * dy) ** 2, nearest)
+    return np.sqrt(nearest)
+
+
+# Las envolventes son simétricas respecto a sigma1 = sigma2 (y Tresca y
+# Rankine también respecto al origen), y el punto más cercano de la frontera
+# queda del mismo lado de cada eje de simetría que el estado. Los estados se
+# llevan a sigma1 >= sigma2 (y sigma1 + sigma2 >= 0) y solo se revisan los
+# lados de ese sector
+def _fold(sigma1, sigma2, central=True):
+    high = np.maximum(sigma1, sigma2)
+    low = np.minimum(sigma1, sigma2)
+    if central:
+        flip = high + low < 0
+        high, low = np.where(flip, -low, high), np.where(flip, -high, low)
+    return high, low
+
+
+# Hexágono de Tresca: en el sector quedan los lados sigma1 = sigma_yield y
+# sigma1 - sigma2 = sigma_yield
+def _tresca_distance(sigma1, sigma2, sigma_yield):
+    y = sigma_yield
+    start = np.array([[y, 0.0], [0.0, -y]])
+    direction = np.array([[0.0, y], [y, y]])
+    return _segment_distance(*_fold(sigma1, sigma2), start, direction)
+
+
+# Cuadrado de Rankine |sigma| <= sigma_u: distancia a una caja
+def _rankine_distance(sigma1, sigma2, sigma_u):
+    q1 = np.abs(sigma1) - sigma_u
+    q2 = np.abs(sigma2) - sigma_u
+    outside = np.hypot(np.maximum(q1, 0.0), np.maximum(q2, 0.0))
+    return np.where(outside > 0, outside, -np.maximum(q1, q2))
+
+
+# La envolvente de failurefunc.mohr es r < r_max, con r el radio del círculo
+# y r_max lineal en el centro: una cuña con el vértice en sigma1 = sigma2 del
+# lado de tensión, abierta hacia compresión (o una franja si sigma_uc =
+# sigma_ut). En el sector sigma1 >= sigma2 queda el lado
+# (sigma1 - sigma2) / 2 + k (sigma1 + sigma2) / 2 = r_c (1 - k)
+def _mohr_distance(sigma1, sigma2, sigma_uc, sigma_ut):
+    r_c = sigma_uc / 2.0
+    r_t = sigma_ut / 2.0
+    k = (r_c - r_t) / (r_c + r_t)
+    high, low = _fold(sigma1, sigma2, central=False)
+    normal = np.array([(1 + k) / 2, (k - 1) / 2])
+    offset = r_c * (1 - k)
+    if k == 0:
+        return np.abs(offset - high * normal[0] - low * normal[1]) / np.hypot(*normal)
+    # rayo desde el vértice sobre el lado, hacia compresión (hacia tensión si
+    # sigma_uc < sigma_ut)
+    apex = np.full((1, 2), offset / k)
+    direction = np.sign(k) * np.array([[normal[1], -normal[0]]])
+    return _segment_distance(high, low, apex, direction, np.inf)
+
+
+# Distancia sin signo a la elipse de von Mises sigma1² - sigma1 sigma2 +
+# sigma2² = sigma_yield². En los ejes u = (sigma1 + sigma2) / sqrt(2),
+# v = (sigma1 - sigma2) / sqrt(2) los semiejes son a = sqrt(2) sigma_yield y
+# b = sqrt(2/3) sigma_yield. El punto más cercano se obtiene con el parámetro
+# s de Eberly ("Distance from a point to an ellipse"): G(s) es convexa y
+# decreciente y Newton desde s0 = z1 - 1, donde G >= 0, converge sin pasarse
+def _von_mises_distance(sigma1, sigma2, sigma_yield, iterations=40):
+    a = np.sqrt(2.0) * sigma_yield
+    b = np.sqrt(2.0 / 3.0) * sigma_yield
+    y0 = np.abs(sigma1 + sigma2) / np.sqrt(2.0)
+    y1 = np.abs(sigma1 - sigma2) / np.sqrt(2.0)
+    z0 = y0 / a
+    z1 = y1 / b
+    r0 = (a / b) ** 2
+
+    # cerca del eje mayor (y1 = 0) s0 = -1 es singular y se usa la solución
+    # directa de ese caso
+    axis = z1 < 1e-12
+    s = np.where(axis, 0.0, z1 - 1.0)
+    for _ in range(iterations):
+        p = r0 * z0 / (s + r0)
+        q = z1 / (s + 1.0)
+        g = p * p + q * q - 1.0
+        slope = -2.0 * (p * p / (s + r0) + q * q / (s + 1.0))
+        step = np.divide(g, slope, out=np.zeros_like(g), where=~axis)
+        s = s - step
+        if np.abs(step).max(initial=0.0) <= 1e-15 * np.abs(s).max(initial=1.0):
+            break
+    x0 = r0 * y0 / (s + r0)
+    x1 = y1 / (s + 1.0)
+
+    if axis.any():
+        limit = (a * a - b * b) / a
+        e0 = y0[axis]
+        inner = e0 < limit
+        x0a = np.where(inner, a * a * e0 / (a * a - b * b), a)
+        x1a = np.where(inner, b * np.sqrt(np.clip(1 - (x0a / a) ** 2, 0, None)), 0.0)
+        x0[axis] = x0a
+        x1[axis] = x1a
+    return np.hypot(x0 - y0, x1 - y1)
+
+
+def _unsigned_distance(criterion, sigma1, sigma2, material):
+    if criterion == "tresca":
+        return _tresca_distance(sigma1, sigma2, material["sigma_yield"])
+    if criterion == "rankine":
+        return _rankine_distance(sigma1, sigma2, material["sigma_u"])
+    if criterion == "von_mises":
+        return _von_mises_distance(sigma1, sigma2, material["sigma_yield"])
+    return _mohr_distance(sigma1, sigma2, material["sigma_uc"], material["sigma_ut"])
+
+
+# Distancia con signo de los estados (sigma1, sigma2) a la envolvente del
+# criterio: positiva dentro (sin falla), negativa fuera. Con method="polygon"
+# se usa la envolvente trazada por envelopefunc con un PolygonIndex en lugar
+# de la forma cerrada; solo para envolventes cerradas
+def envelope_distance(criterion, sigma1, sigma2, method="exact", **material):
+    if criterion not in CRITERIA:
+        raise ValueError(f"Criterio desconocido: {criterion}")
+    sigma1, sigma2 = np.broadcast_arrays(
+        np.asarray(sigma1, dtype=float), np.asarray(sigma2, dtype=float)
+    )
+    material = {name: float(material[name]) for name in CRITERIA[criterion]}
+    if method == "polygon":
+        index = polygon_index(criterion, **material)
+    elif method != "exact":
+        raise ValueError(f"method debe ser 'exact' o 'polygon', se dio {method!r}")
+
+    shape = sigma1.shape
+    sigma1 = sigma1.ravel()
+    sigma2 = sigma2.ravel()
+    distance = np.empty(sigma1.shape)
+    for start in range(0, len(sigma1), CHUNK_SIZE):
+        block = slice(start, start + CHUNK_SIZE)
+        if method == "polygon":
+            distance[block] = index.distance(sigma1[block], sigma2[block])
+        else:
+            distance[block] = _unsigned_distance(
+                criterion, sigma1[block], sigma2[block], material
+            )
+    inside = criterion_fs(criterion, sigma1, sigma2, **material) >= 1.0
+    return np.where(inside, distance, -distance).reshape(shape)
+
+
+# Agrega dist_<criterio> a los resultados de un bloque por cada fs_<criterio>,
+# con los esfuerzos principales sigma_1 y sigma_2
+def add_distances(results, **material):
+    for key in list(results):
+        if key.startswith("fs_"):
+            name = key[3:]
+            results[f"dist_{name}"] = envelope_distance(
+                name, results["sigma_1"], results["sigma_2"], **material
+            )
+    return results
+
+
+# evaluate(states) seguido de add_distances, para usar con evaluate_blocks
+def evaluate_with_distances(states, evaluate, **material):
+    return add_distances(evaluate(states), **material)
+
+
+# Índice de malla sobre los lados de un polígono (puede tener nan para cortar
+# la línea, como las envolventes abiertas). Para cada celda se guardan los
+# lados que pueden ser los más cercanos a algún punto de la celda: los que
+# están a menos de (distancia al lado más cercano desde el centro + diagonal
+# de la celda) del centro. Cada punto solo se compara con los lados de su
+# celda; los puntos fuera de la malla se comparan con todos
+class PolygonIndex:
+    def __init__(self, points, cells=None, padding=1.0):
+        points = np.asarray(points, dtype=float)
+        valid = ~(np.isnan(points[:-1]).any(axis=1) | np.isnan(points[1:]).any(axis=1))
+        start = points[:-1][valid]
+        direction = points[1:][valid] - start
+        # cada lado como (x0, y0, dx, dy, 1 / longitud²), un arreglo por
+        # componente: los candidatos de un grupo se toman componente por
+        # componente y quedan contiguos
+        self.segments = (
+            *start.T.copy(),
+            *direction.T.copy(),
+            1.0 / np.einsum("ij,ij->i", direction, direction),
+        )
+        if cells is None:
+            cells = int(np.clip(12 * np.sqrt(len(start)), 16, 256))
+            # con pocos lados compararlos todos es igual de rápido
+            if len(start) <= SMALL_POLYGON:
+                cells = 0
+        self.cells = cells
+        if cells == 0:
+            return
+
+        ends = np.vstack([start, start + direction])
+        low, high = ends.min(axis=0), ends.max(axis=0)
+        span = (high - low).max() * (1 + 2 * padding)
+        self.origin = (low + high) / 2 - span / 2
+        self.size = span / cells
+
+        # lados candidatos de todas las celdas seguidos; los de la celda c son
+        # edges[offsets[c]:offsets[c] + counts[c]]. Se calculan por filas de
+        # celdas para no crear un arreglo (celdas², lados)
+        centers = (np.arange(cells) + 0.5) * self.size
+        cy = self.origin[1] + centers
+        edges = []
+        self.counts = np.empty(cells * cells, dtype=np.int64)
+        for row in range(cells):
+            cx = np.full(cells, self.origin[0] + centers[row])
+            to_edges = np.sqrt(_nearest2(cx[:, None], cy[:, None], self.segments))
+            reach = to_edges.min(axis=1, keepdims=True) + np.sqrt(2.0) * self.size
+            cell, edge = np.nonzero(to_edges <= reach)
+            edges.append(edge)
+            self.counts[row * cells : (row + 1) * cells] = np.bincount(
+                cell, minlength=cells
+            )
+        self.edges = np.concatenate(edges)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+
+    # distancia sin signo de los puntos (x, y) al polígono
+    def distance(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        nearest = np.empty(x.shape)
+        if self.cells == 0:
+            return np.sqrt(self._brute_force2(x, y, np.arange(len(x)), nearest))
+        i = np.floor((x - self.origin[0]) / self.size).astype(np.int64)
+        j = np.floor((y - self.origin[1]) / self.size).astype(np.int64)
+        inside = (i >= 0) & (i < self.cells) & (j >= 0) & (j < self.cells)
+        cell = np.where(inside, i * self.cells + j, 0)
+        count = np.where(inside, self.counts[cell], 0)
+
+        # los puntos se agrupan por el número de candidatos de su celda
+        # (redondeado a potencias de 2) para comparar cada grupo con un
+        # arreglo (n, ancho) sin rellenar todo hasta la celda más poblada
+        width = 1
+        while width // 2 < count.max(initial=0):
+            group = np.flatnonzero((count > width // 2) & (count <= width))
+            step = max(1, PAIRS // width)
+            for start in range(0, len(group), step):
+                block = group[start : start + step]
+                # las posiciones de más repiten el último candidato
+                column = np.minimum(np.arange(width), count[block, None] - 1)
+                edges = self.edges[self.offsets[cell[block], None] + column]
+                segments = [component[edges] for component in self.segments]
+                nearest[block] = _nearest2(
+                    x[block, None], y[block, None], segments
+                ).min(axis=1)
+            width *= 2
+
+        self._brute_force2(x, y, np.flatnonzero(~inside), nearest)
+        return np.sqrt(nearest)
+
+    # distancias al cuadrado de los puntos points a todos los lados, en out
+    def _brute_force2(self, x, y, points, out):
+        step = max(1, PAIRS // len(self.segments[0]))
+        for start in range(0, len(points), step):
+            block = points[start : start + step]
+            out[block] = _nearest2(x[block, None], y[block, None], self.segments).min(
+                axis=1
+            )
+        return out
+
+
+# distancias al cuadrado de los puntos (x, y) a los lados segments de
+# PolygonIndex, con broadcasting
+def _nearest2(x, y, segments):
+    x0, y0, dx, dy, inverse = segments
+    rx = x - x0
+    ry = y - y0
+    t = np.clip((rx * dx + ry * dy) * inverse, 0.0, 1.0)
+    return (rx - t * dx) ** 2 + (ry - t * dy) ** 2
+
+
+# índice de la envolvente trazada del criterio, uno por material. Las
+# envolventes abiertas (Mohr) se cortan en el alcance del trazado y lejos de
+# él la distancia al polígono no es la distancia a la envolvente
+@functools.lru_cache(maxsize=32)
+def _polygon_index(criterion, parameters):
+    material = dict(zip(CRITERIA[criterion], parameters))
+    envelope = trace_envelope(criterion, **material)
+    if not envelope.closed:
+        raise ValueError(f"La envolvente de {criterion} es abierta: use method='exact'")
+    return PolygonIndex(envelope.points)
+
+
+def polygon_index(criterion, **material):
+    parameters = tuple(float(material[name]) for name in CRITERIA[criterion])
+    return _polygon_index(criterion, parameters)
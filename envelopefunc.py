@@ -0,0 +1,164 @@
+import functools
+
+import numpy as np
+
+import failurefunc
+from bulkfunc import CRITERIA
+
+# En este módulo se traza la frontera FS = 1 (envolvente de falla) de los
+# criterios de failurefunc en el plano (sigma_1, sigma_2), sin evaluar una
+# malla completa. Las envolventes de todos los criterios rodean al origen y
+# cada rayo desde el origen las cruza una sola vez, así que:
+#   1. en cada dirección el radio de la frontera se encuentra por bisección,
+#      todas las direcciones a la vez en una sola llamada al criterio;
+#   2. entre dos puntos vecinos se agrega el punto de la dirección intermedia
+#      solo si se aleja de la cuerda más que la tolerancia, y se repite hasta
+#      que ningún tramo la supere.
+# Los puntos se concentran en las esquinas (Tresca, Rankine) y en las partes
+# más curvas (von Mises); los tramos rectos quedan con sus extremos
+
+
+# FS del criterio en los puntos (sigma1, sigma2), con los parámetros del
+# material de bulkfunc.CRITERIA
+def criterion_fs(criterion, sigma1, sigma2, **material):
+    if criterion not in CRITERIA:
+        raise ValueError(f"Criterio desconocido: {criterion}")
+    batch = getattr(failurefunc, f"{criterion}_batch")
+    parameters = [material[name] for name in CRITERIA[criterion]]
+    return batch(sigma1, sigma2, *parameters)[1]
+
+
+class Envelope:
+    def __init__(self, points, evaluations, tolerance):
+        # polígono cerrado (k + 1, 2): el último punto repite el primero
+        self.points = points
+        self.evaluations = evaluations
+        self.tolerance = tolerance
+        self.points.setflags(write=False)
+
+    @property
+    def closed(self):
+        return not np.isnan(self.points).any()
+
+
+# Radio de la frontera en cada dirección angles, con error menor que
+# tolerance. Las direcciones en las que no hay falla hasta reach (la
+# envolvente es abierta, como Mohr en compresión biaxial) quedan con radio
+# reach. Devuelve (radios, evaluaciones del criterio)
+def _boundary_radius(fs, angles, high, tolerance, reach):
+    directions = np.stack([np.cos(angles), np.sin(angles)])
+    low = np.zeros_like(angles)
+    high = np.minimum(high, reach)
+    evaluations = 0
+
+    # se alarga high hasta que el punto falle o llegue a reach
+    active = np.ones(len(angles), dtype=bool)
+    while active.any():
+        outside = fs(*(directions[:, active] * high[active])) < 1.0
+        evaluations += int(active.sum())
+        index = np.flatnonzero(active)
+        inside = index[~outside]
+        low[inside] = high[inside]
+        open_ = inside[high[inside] >= reach]
+        grow = inside[high[inside] < reach]
+        high[grow] = np.minimum(2.0 * high[grow], reach)
+        active[index[outside]] = False
+        active[open_] = False
+
+    closed = low < reach
+    while closed.any() and (high - low)[closed].max() > tolerance:
+        middle = (low[closed] + high[closed]) / 2.0
+        outside = fs(*(directions[:, closed] * middle)) < 1.0
+        evaluations += int(closed.sum())
+        high[closed] = np.where(outside, middle, high[closed])
+        low[closed] = np.where(outside, low[closed], middle)
+    return (low + high) / 2.0, evaluations
+
+
+# Traza la envolvente con error geométrico menor que tolerance (en unidades de
+# esfuerzo; por defecto una milésima de la resistencia mayor). start es el
+# número inicial de direcciones y max_points limita los puntos del polígono.
+# Si la envolvente es abierta se traza hasta reach (por defecto cuatro veces
+# la resistencia mayor) y los puntos que quedan ahí se cambian por nan para
+# cortar la línea al dibujarla
+def trace_envelope(
+    criterion, tolerance=None, start=16, max_points=4096, reach=None, **material
+):
+    missing = [name for name in CRITERIA.get(criterion, ()) if name not in material]
+    if missing:
+        raise ValueError(f"El criterio {criterion} necesita {', '.join(missing)}")
+    parameters = tuple(float(material[name]) for name in CRITERIA[criterion])
+    if min(parameters) <= 0:
+        raise ValueError("Las resistencias deben ser positivas")
+    if tolerance is None:
+        tolerance = 1e-3 * max(parameters)
+    if reach is None:
+        reach = 4.0 * max(parameters)
+    return _trace(
+        criterion, parameters, float(tolerance), start, max_points, float(reach)
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _trace(criterion, parameters, tolerance, start, max_points, reach):
+    material = dict(zip(CRITERIA[criterion], parameters))
+    fs = functools.partial(criterion_fs, criterion, **material)
+    # la bisección radial con una fracción de la tolerancia, el resto es para
+    # la distancia a la cuerda
+    radial = tolerance / 4.0
+
+    angles = np.linspace(0.0, 2 * np.pi, start, endpoint=False)
+    radii, evaluations = _boundary_radius(
+        fs, angles, np.full(start, max(parameters)), radial, reach
+    )
+    # tramos pendientes: índices i de angles cuyo tramo (i, i + 1) falta revisar
+    pending = np.arange(len(angles))
+    while len(pending) and len(angles) < max_points:
+        following = (pending + 1) % len(angles)
+        a0 = angles[pending]
+        a1 = np.where(following == 0, 2 * np.pi, angles[following])
+        r0, r1 = radii[pending], radii[following]
+        middle_angles = (a0 + a1) / 2.0
+        middle_radii, count = _boundary_radius(
+            fs, middle_angles, 2.0 * np.maximum(r0, r1), radial, reach
+        )
+        evaluations += count
+
+        # distancia del punto intermedio a la cuerda entre los vecinos
+        p0 = np.stack([r0 * np.cos(a0), r0 * np.sin(a0)], axis=-1)
+        p1 = np.stack([r1 * np.cos(a1), r1 * np.sin(a1)], axis=-1)
+        pm = np.stack(
+            [
+                middle_radii * np.cos(middle_angles),
+                middle_radii * np.sin(middle_angles),
+            ],
+            axis=-1,
+        )
+        chord = p1 - p0
+        cross = chord[:, 0] * (pm - p0)[:, 1] - chord[:, 1] * (pm - p0)[:, 0]
+        distance = np.abs(cross) / np.maximum(np.hypot(*chord.T), 1e-300)
+        # la mitad de la tolerancia queda para el error de los radios
+        refine = distance > tolerance / 2.0
+
+        # se insertan los puntos intermedios de los tramos a refinar; sus dos
+        # mitades se revisan en la siguiente vuelta
+        new_angles = np.concatenate([angles, middle_angles[refine]])
+        new_radii = np.concatenate([radii, middle_radii[refine]])
+        order = np.argsort(new_angles, kind="stable")
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order))
+        inserted = position[len(angles) :]
+        before = position[pending[refine]]
+        pending = np.sort(np.concatenate([before, inserted]))
+        angles, radii = new_angles[order], new_radii[order]
+
+    points = np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+    points[radii >= reach] = np.nan
+    return Envelope(np.vstack([points, points[:1]]), evaluations, tolerance)
+
+
+# Evaluaciones que necesitaría una malla uniforme con espaciamiento tolerance
+# sobre el cuadrado que contiene a la envolvente, para comparar
+def grid_evaluations(envelope):
+    reach = np.nanmax(np.abs(envelope.points))
+    return int(np.ceil(2 * reach / envelope.tolerance) + 1) ** 2
@@ -1,36 +1,72 @@
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
 from failurefunc import tresca, von_mises, rankine, mohr, plot_mohrs_circle
+from figurefunc import quantize, session_subplots, show_cached_figure, show_figure
+from envelopefunc import trace_envelope
+from fsmapfunc import (
+    map_boundary,
+    map_extent,
+    map_image,
+    map_scale,
+    plot_fs_map,
+    safety_factor_map,
+    unit_safety_factor,
+)
+from reliabilityfunc import RandomVariable, iter_failure_probability
+
+
+# Mapa normalizado del FS de un criterio: imagen y frontera FS = 1. No depende
+# de la resistencia (solo de sigma_uc / sigma_ut en Mohr), así que al cambiar
+# sigma_yield se reutiliza y solo se redibujan los ejes
+@st.cache_resource(max_entries=16, show_spinner="Calculando mapa...")
+def mapa_fs(criterio, resolucion, razon):
+    extension = map_extent(criterio, razon)
+    axis, fs = safety_factor_map(criterio, resolucion, extension, razon)
+    frontera = map_boundary(criterio, extension, resolucion, razon)
+    return map_image(fs), frontera, extension
 
-plt.rcParams["font.family"] = "monospace"
 
 st.title("Criterios de falla")
 st.set_page_config(page_title="Criterios de falla", layout=None)
 
 materiales = ["Dúctil", "Frágil - Rankine", "Frágil - Mohr"]
 
+# valores iniciales enviados desde Transformación de deformaciones
+sigma1_inicial, sigma2_inicial = st.session_state.get(
+    "principales_falla", (50.0, 100.0)
+)
+
 with st.container(border=True):
     st.write("Ingrese los valores de esfuerzos principales")
     col1, col2, col3 = st.columns(3)
     with col1:
-        sigma1 = st.number_input("$\sigma_{1}$", value=50.0, step=1.0)
+        sigma1 = st.number_input("$\sigma_{1}$", value=sigma1_inicial, step=1.0)
     with col2:
-        sigma2 = st.number_input("$\sigma_{2}$", value=100.0, step=1.0)
+        sigma2 = st.number_input("$\sigma_{2}$", value=sigma2_inicial, step=1.0)
     with col3:
         seleccion_material = st.radio("Tipo de material", options=materiales)
 
     if seleccion_material == "Dúctil":
         with col1:
-            sigma_yield = st.number_input("$\sigma_{YP}$", value=100.0, step=1.0)
+            sigma_yield = st.number_input(
+                "$\sigma_{YP}$", value=100.0, min_value=1.0, step=1.0
+            )
     elif seleccion_material == "Frágil - Mohr":
         with col1:
-            sigma_ut = st.number_input("$\sigma_{UT}$", value=100.0, step=1.0)
+            sigma_ut = st.number_input(
+                "$\sigma_{UT}$", value=100.0, min_value=1.0, step=1.0
+            )
         with col2:
-            sigma_uc = st.number_input("$\sigma_{UC}$", value=200.0, step=1.0)
+            sigma_uc = st.number_input(
+                "$\sigma_{UC}$", value=200.0, min_value=1.0, step=1.0
+            )
     else:
         with col1:
-            sigma_u = st.number_input("$\sigma_{U}$", value=100.0, step=1.0)
+            sigma_u = st.number_input(
+                "$\sigma_{U}$", value=100.0, min_value=1.0, step=1.0
+            )
 
 if seleccion_material == "Dúctil":
     failure_tresca_bool, fs_tresca = tresca(sigma1, sigma2, sigma_yield)
@@ -64,27 +100,14 @@ if seleccion_material == "Dúctil":
         else:
             st.write("En construcción...")
 
-    fig, ax = plt.subplots()
-
-    surface_tresca = np.array(
-        [
-            [sigma_yield, 0],
-            [sigma_yield, sigma_yield],
-            [0, sigma_yield],
-            [-sigma_yield, 0],
-            [-sigma_yield, -sigma_yield],
-            [0, -sigma_yield],
-            [sigma_yield, 0],
-        ]
-    )
+    fig, ax = session_subplots("falla")
 
-    # estas son las ecuaciones parametricas de una elipse rotada 45 grados
-    t = np.linspace(-2 * np.pi, 2 * np.pi, 100)
-    x = sigma_yield * np.cos(t) - sigma_yield / np.sqrt(3) * np.sin(t)
-    y = sigma_yield * np.cos(t) + sigma_yield / np.sqrt(3) * np.sin(t)
+    # envolventes trazadas con refinamiento adaptativo, guardadas por material
+    envolvente_tresca = trace_envelope("tresca", sigma_yield=sigma_yield).points
+    envolvente_vm = trace_envelope("von_mises", sigma_yield=sigma_yield).points
 
-    ax.plot(surface_tresca[:, 0], surface_tresca[:, 1], label="Tresca")
-    ax.plot(x, y, label="Von Mises")
+    ax.plot(envolvente_tresca[:, 0], envolvente_tresca[:, 1], label="Tresca")
+    ax.plot(envolvente_vm[:, 0], envolvente_vm[:, 1], label="Von Mises")
     ax.plot([sigma1], [sigma2], "bo", markersize=4)
 
     ax.set_aspect("equal")
@@ -102,7 +125,7 @@ if seleccion_material == "Dúctil":
     for label in ax.get_yticklabels():
         if label.get_text() == "0":
             label.set_visible(False)
-    st.pyplot(fig)
+    show_figure(fig)
 
 elif seleccion_material == "Frágil - Rankine":
     failure_rankine_bool, fs_rankine = rankine(sigma1, sigma2, sigma_u)
@@ -118,18 +141,10 @@ elif seleccion_material == "Frágil - Rankine":
         with cols[1]:
             st.metric("$FS_{Rankine}$", f"{fs_rankine:.2f}")
 
-    surface_rankine = np.array(
-        [
-            [sigma_u, sigma_u],
-            [-sigma_u, sigma_u],
-            [-sigma_u, -sigma_u],
-            [sigma_u, -sigma_u],
-            [sigma_u, sigma_u],
-        ]
-    )
+    envolvente_rankine = trace_envelope("rankine", sigma_u=sigma_u).points
 
-    fig, ax = plt.subplots()
-    ax.plot(surface_rankine[:, 0], surface_rankine[:, 1], label="Rankine")
+    fig, ax = session_subplots("falla")
+    ax.plot(envolvente_rankine[:, 0], envolvente_rankine[:, 1], label="Rankine")
     ax.plot([sigma1], [sigma2], "bo", markersize=4)
     ax.set_aspect("equal")
     ax.spines["left"].set_position("zero")
@@ -146,10 +161,10 @@ elif seleccion_material == "Frágil - Rankine":
     for label in ax.get_yticklabels():
         if label.get_text() == "0":
             label.set_visible(False)
-    st.pyplot(fig)
+    show_figure(fig)
 
 elif seleccion_material == "Frágil - Mohr":
-    fig, ax = plt.subplots()
+    fig, ax = session_subplots("falla")
     x_axis_label = "$\sigma$"
     y_axis_label = "$\\tau$"
 
@@ -210,7 +225,200 @@ elif seleccion_material == "Frágil - Mohr":
 
     ax.legend(loc=8, bbox_to_anchor=(0.5, -0.2), ncols=2, frameon=False)
 
-    st.pyplot(fig)
+    show_figure(fig)
+
+    # envolvente en el plano (sigma_1, sigma_2); en compresión biaxial no se
+    # cierra y se corta a cuatro veces la resistencia mayor
+    envolvente_mohr = trace_envelope("mohr", sigma_uc=sigma_uc, sigma_ut=sigma_ut)
+    fig, ax = session_subplots("falla_plano")
+    ax.plot(
+        envolvente_mohr.points[:, 0],
+        envolvente_mohr.points[:, 1],
+        label="Envolvente de Mohr",
+    )
+    ax.plot([sigma1], [sigma2], "bo", markersize=4)
+    ax.set_aspect("equal")
+    ax.spines["left"].set_position("zero")
+    ax.spines["bottom"].set_position("zero")
+    ax.spines[["right", "top"]].set_visible(False)
+    ax.legend(loc=8, bbox_to_anchor=(0.5, -0.2), ncols=2, frameon=False)
+    ax.set_xlabel("$\sigma_1$", loc="right")
+    ax.set_ylabel("$\sigma_2$", loc="top", rotation=0)
+    show_figure(fig)
 
 else:
     pass
+
+# mapas del factor de seguridad sobre el plano (sigma_1, sigma_2)
+criterios_mapa = {
+    "Dúctil": [("tresca", "Tresca"), ("von_mises", "von Mises")],
+    "Frágil - Rankine": [("rankine", "Rankine")],
+    "Frágil - Mohr": [("mohr", "Mohr")],
+}[seleccion_material]
+if seleccion_material == "Dúctil":
+    propiedades = {"sigma_yield": sigma_yield}
+elif seleccion_material == "Frágil - Rankine":
+    propiedades = {"sigma_u": sigma_u}
+else:
+    propiedades = {"sigma_uc": sigma_uc, "sigma_ut": sigma_ut}
+
+with st.expander("Mapas de factor de seguridad"):
+    resolucion = st.select_slider(
+        "Resolución de la malla",
+        options=[250, 500, 1000, 2000],
+        value=1000,
+        help="La malla se refina cerca de la frontera FS = 1",
+    )
+    columnas = st.columns(len(criterios_mapa))
+    for columna, (criterio, nombre) in zip(columnas, criterios_mapa):
+        resistencia, razon = map_scale(criterio, **propiedades)
+        imagen, frontera, extension = mapa_fs(criterio, resolucion, razon)
+        fs_estado = float(
+            unit_safety_factor(
+                criterio, sigma1 / resistencia, sigma2 / resistencia, razon
+            )
+        )
+
+        def draw_map(fig, ax):
+            plot_fs_map(
+                imagen,
+                frontera,
+                extension,
+                resistencia,
+                sigma1,
+                sigma2,
+                fs_estado,
+                nombre,
+                ax,
+            )
+
+        with columna:
+            show_cached_figure(
+                ("mapa_fs", criterio, resolucion, razon)
+                + quantize(resistencia, sigma1, sigma2),
+                f"mapa_{criterio}",
+                draw_map,
+            )
+
+# probabilidad de falla con los esfuerzos y las resistencias aleatorios
+with st.expander("Confiabilidad (Monte Carlo)"):
+    st.write(
+        "Los valores de arriba son las medias. Se estima la probabilidad de "
+        "falla $P_f$ con su intervalo de confianza de 95 %."
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        cv_esfuerzos = st.number_input(
+            "C.V. de los esfuerzos (%)", value=10.0, min_value=0.0, step=1.0
+        )
+        precision = st.number_input(
+            "Precisión relativa de $P_f$ (%)",
+            value=5.0,
+            min_value=0.1,
+            step=1.0,
+            help="La simulación se detiene cuando el semiancho del intervalo es "
+            "menor que este porcentaje de $P_f$",
+        )
+    with col2:
+        cv_resistencias = st.number_input(
+            "C.V. de las resistencias (%)", value=8.0, min_value=0.0, step=1.0
+        )
+        max_muestras = st.select_slider(
+            "Máximo de muestras",
+            options=[100_000, 1_000_000, 10_000_000],
+            value=10_000_000,
+        )
+    with col3:
+        distribucion = st.radio(
+            "Distribución de las resistencias", options=["lognormal", "normal"]
+        )
+        semilla = st.number_input("Semilla", value=0, min_value=0, step=1)
+    # la normal de las resistencias se trunca en cero; con mucha dispersión
+    # la truncada se aleja de la media y la desviación dadas
+    if distribucion == "normal" and cv_resistencias > 30.0:
+        st.warning(
+            "Con un C.V. mayor que 30 % la normal genera resistencias negativas, "
+            "que se descartan: la media y la dispersión efectivas cambian. Use "
+            "la lognormal."
+        )
+    calcular = st.button("Calcular $P_f$")
+
+    variables = {
+        nombre: RandomVariable(valor, abs(valor) * cv_esfuerzos / 100.0)
+        for nombre, valor in (("sigma1", sigma1), ("sigma2", sigma2))
+    }
+    variables.update(
+        (
+            nombre,
+            RandomVariable(
+                valor, valor * cv_resistencias / 100.0, distribucion, lower=0.0
+            ),
+        )
+        for nombre, valor in propiedades.items()
+    )
+    llave = (
+        (sigma1, sigma2, cv_esfuerzos, cv_resistencias, distribucion)
+        + tuple(sorted(propiedades.items()))
+        + (precision, max_muestras, semilla)
+    )
+    nombres = dict(criterios_mapa)
+
+    if calcular:
+        progreso = st.empty()
+        historia = []
+        inicio = time.perf_counter()
+        for estimaciones in iter_failure_probability(
+            variables,
+            max_samples=max_muestras,
+            relative=precision / 100.0,
+            seed=int(semilla),
+        ):
+            estimaciones = {
+                criterio: estimacion
+                for criterio, estimacion in estimaciones.items()
+                if criterio in nombres
+            }
+            historia.append(estimaciones)
+            muestras = next(iter(estimaciones.values())).samples
+            progreso.progress(
+                min(1.0, muestras / max_muestras), f"Muestras: {muestras:,}"
+            )
+        duracion = time.perf_counter() - inicio
+        progreso.empty()
+        st.session_state["confiabilidad"] = (llave, historia, duracion)
+
+    resultado = st.session_state.get("confiabilidad")
+    if resultado is not None and resultado[0] == llave:
+        _, historia, duracion = resultado
+        final = historia[-1]
+        muestras = next(iter(final.values())).samples
+        st.write(
+            f"{muestras:,} muestras en {duracion:.2f} s "
+            f"({muestras / max(duracion, 1e-9):,.0f} muestras/s)"
+        )
+        columnas = st.columns(len(final))
+        for columna, (criterio, estimacion) in zip(columnas, final.items()):
+            with columna:
+                st.metric(f"$P_f$ {nombres[criterio]}", f"{estimacion.probability:.3e}")
+                st.write(f"Intervalo: [{estimacion.low:.3e}, {estimacion.high:.3e}]")
+                if estimacion.relative_half_width > precision / 100.0:
+                    st.warning("No se alcanzó la precisión pedida")
+
+        # convergencia de P_f y de su intervalo con el número de muestras
+        fig, ax = session_subplots("confiabilidad")
+        for criterio in final:
+            n = [paso[criterio].samples for paso in historia]
+            p = [paso[criterio].probability for paso in historia]
+            (linea,) = ax.plot(n, p, label=nombres[criterio])
+            ax.fill_between(
+                n,
+                [paso[criterio].low for paso in historia],
+                [paso[criterio].high for paso in historia],
+                color=linea.get_color(),
+                alpha=0.2,
+            )
+        ax.set_xscale("log")
+        ax.set_xlabel("Muestras")
+        ax.set_ylabel("$P_f$")
+        ax.legend(frameon=False)
+        show_figure(fig)
@@ -54,11 +54,164 @@ def mohr(sigma1, sigma2, sigma_uc, sigma_ut):
     else:
         failure_bool = True
 
-    fs = r / r_max
+    # mismo criterio que _mohr_margin: con radio cero el FS es infinito salvo
+    # que el centro ya esté fuera de la envolvente, y nunca es negativo
+    if r == 0:
+        fs = np.inf if r_max > 0 else 0.0
+    else:
+        fs = max(r_max / r, 0.0)
 
     return failure_bool, fs
 
 
+# ----- Versiones vectorizadas para arreglos de esfuerzos principales -----
+# Reciben arreglos de sigma1, sigma2 y devuelven una máscara booleana de falla
+# y un arreglo de factores de seguridad. En puntos sin esfuerzo el FS es infinito
+
+
+def _safety_factor(strength, stress):
+    shape = np.broadcast(strength, stress).shape
+    return np.divide(
+        strength, stress, out=np.full(shape, np.inf), where=np.asarray(stress) != 0
+    )
+
+
+def _tresca_stress(sigma1, sigma2, abs1, abs2):
+    # mismo signo: el mayor en valor absoluto, signos opuestos: la suma
+    return np.where(
+        np.sign(sigma1) == np.sign(sigma2), np.maximum(abs1, abs2), abs1 + abs2
+    )
+
+
+def _von_mises_stress(sigma1, sigma2):
+    return np.sqrt(sigma1**2 - sigma1 * sigma2 + sigma2**2)
+
+
+def _mohr_margin(sigma1, sigma2, sigma_uc, sigma_ut):
+    r_c = sigma_uc / 2.0
+    r_t = sigma_ut / 2.0
+    center = (sigma1 + sigma2) / 2.0
+    r = np.abs(sigma1 - sigma2) / 2.0
+    r_max = r_c - (r_c + center) * (r_c - r_t) / (r_c + r_t)
+
+    # si el radio es cero el FS es infinito, salvo que el centro ya esté
+    # fuera de la envolvente (r_max <= 0). Con r_max < 0 el estado falla aun
+    # sin cortante y el FS es cero, no negativo
+    fs = np.divide(
+        r_max,
+        r,
+        out=np.where(r_max > 0, np.inf, 0.0),
+        where=r != 0,
+    )
+    return r >= r_max, np.maximum(fs, 0.0)
+
+
+# Tensiones de un estado en 3D: con sigma3 se usan los tres esfuerzos
+# principales, en cualquier orden. Tresca y Mohr usan el círculo mayor
+# (máximo y mínimo de los tres)
+def _tresca_stress_3d(sigma1, sigma2, sigma3):
+    high = np.maximum(np.maximum(sigma1, sigma2), sigma3)
+    low = np.minimum(np.minimum(sigma1, sigma2), sigma3)
+    return high - low
+
+
+def _von_mises_stress_3d(sigma1, sigma2, sigma3):
+    return np.sqrt(
+        ((sigma1 - sigma2) ** 2 + (sigma2 - sigma3) ** 2 + (sigma3 - sigma1) ** 2) / 2
+    )
+
+
+def _rankine_stress(abs1, abs2, abs3=None):
+    stress = np.maximum(abs1, abs2)
+    return stress if abs3 is None else np.maximum(stress, abs3)
+
+
+def _as_float(*values):
+    return tuple(None if v is None else np.asarray(v, dtype=float) for v in values)
+
+
+# Las versiones vectorizadas aceptan sigma3 para estados en 3D (por ejemplo los
+# de stressfunc.principal_stress_3d). Sin sigma3 es esfuerzo plano y en Tresca
+# se considera el tercer esfuerzo principal igual a cero, como en tresca()
+def tresca_batch(sigma1, sigma2, sigma_yield, sigma3=None):
+    sigma1, sigma2, sigma3 = _as_float(sigma1, sigma2, sigma3)
+    if sigma3 is None:
+        stress = _tresca_stress(sigma1, sigma2, np.abs(sigma1), np.abs(sigma2))
+    else:
+        stress = _tresca_stress_3d(sigma1, sigma2, sigma3)
+    return stress >= sigma_yield, _safety_factor(sigma_yield, stress)
+
+
+def von_mises_batch(sigma1, sigma2, sigma_yield, sigma3=None):
+    sigma1, sigma2, sigma3 = _as_float(sigma1, sigma2, sigma3)
+    if sigma3 is None:
+        stress = _von_mises_stress(sigma1, sigma2)
+    else:
+        stress = _von_mises_stress_3d(sigma1, sigma2, sigma3)
+    return stress >= sigma_yield, _safety_factor(sigma_yield, stress)
+
+
+def rankine_batch(sigma1, sigma2, sigma_u, sigma3=None):
+    sigma1, sigma2, sigma3 = _as_float(sigma1, sigma2, sigma3)
+    stress = _rankine_stress(
+        np.abs(sigma1), np.abs(sigma2), None if sigma3 is None else np.abs(sigma3)
+    )
+    return stress >= sigma_u, _safety_factor(sigma_u, stress)
+
+
+def mohr_batch(sigma1, sigma2, sigma_uc, sigma_ut, sigma3=None):
+    sigma1, sigma2, sigma3 = _as_float(sigma1, sigma2, sigma3)
+    if sigma3 is not None:
+        sigma1, sigma2 = (
+            np.maximum(np.maximum(sigma1, sigma2), sigma3),
+            np.minimum(np.minimum(sigma1, sigma2), sigma3),
+        )
+    return _mohr_margin(sigma1, sigma2, sigma_uc, sigma_ut)
+
+
+# Evalúa en una sola pasada todos los criterios para los que se dieron
+# propiedades del material: sigma_yield -> Tresca y von Mises,
+# sigma_u -> Rankine, sigma_uc y sigma_ut -> Mohr. Con sigma3 los estados son
+# 3D, como en las funciones _batch.
+# Devuelve un diccionario {criterio: (falla, fs)}
+def evaluate_criteria(
+    sigma1,
+    sigma2,
+    sigma_yield=None,
+    sigma_u=None,
+    sigma_uc=None,
+    sigma_ut=None,
+    sigma3=None,
+):
+    sigma1, sigma2, sigma3 = _as_float(sigma1, sigma2, sigma3)
+    abs1 = np.abs(sigma1)
+    abs2 = np.abs(sigma2)
+    abs3 = None if sigma3 is None else np.abs(sigma3)
+
+    results = {}
+    if sigma_yield is not None:
+        if sigma3 is None:
+            stress = _tresca_stress(sigma1, sigma2, abs1, abs2)
+        else:
+            stress = _tresca_stress_3d(sigma1, sigma2, sigma3)
+        results["tresca"] = (stress >= sigma_yield, _safety_factor(sigma_yield, stress))
+        if sigma3 is None:
+            stress = _von_mises_stress(sigma1, sigma2)
+        else:
+            stress = _von_mises_stress_3d(sigma1, sigma2, sigma3)
+        results["von_mises"] = (
+            stress >= sigma_yield,
+            _safety_factor(sigma_yield, stress),
+        )
+    if sigma_u is not None:
+        stress = _rankine_stress(abs1, abs2, abs3)
+        results["rankine"] = (stress >= sigma_u, _safety_factor(sigma_u, stress))
+    if sigma_uc is not None and sigma_ut is not None:
+        results["mohr"] = mohr_batch(sigma1, sigma2, sigma_uc, sigma_ut, sigma3)
+
+    return results
+
+
 def plot_mohrs_circle(sigma1, sigma2, plot_label, ax):
 
     center = (sigma1 + sigma2) / 2
@@ -0,0 +1,202 @@
+import io
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import streamlit as st
+from profilefunc import profiled, stage
+from startupfunc import wait_warm_up
+
+# En este módulo se manejan las figuras de matplotlib de las páginas.
+# Cada sesión reutiliza sus propias figuras entre reruns en lugar de crear
+# figuras nuevas con plt.subplots(), que quedan registradas en pyplot y nunca
+# se cierran. Las figuras no pasan por pyplot ni guardan un canvas Agg (el
+# buffer de pixeles solo existe mientras se genera el PNG), por lo que se
+# liberan cuando termina la sesión
+
+# todas las figuras vivas creadas por este módulo, en cualquier sesión
+_figures = weakref.WeakSet()
+
+
+# Figura de la sesión asociada a key: se crea la primera vez y en los reruns
+# siguientes se limpia y se reutiliza
+def session_figure(key):
+    figures = st.session_state.setdefault("_figures", {})
+    fig = figures.get(key)
+    if fig is None:
+        # matplotlib se importa hasta que una página necesita una figura
+        wait_warm_up()
+        from matplotlib.figure import Figure
+
+        fig = Figure()
+        figures[key] = fig
+        _figures.add(fig)
+    else:
+        fig.clear()
+        st.session_state.get("_figure_layers", {}).pop(key, None)
+    return fig
+
+
+# equivalente a plt.subplots() con una figura de la sesión
+def session_subplots(key):
+    fig = session_figure(key)
+    ax = fig.add_subplot()
+    return fig, ax
+
+
+def show_figure(fig):
+    with stage("st.pyplot"):
+        st.pyplot(fig)
+
+
+# Cache LRU de las figuras ya renderizadas a PNG, compartida por todas las
+# sesiones. Se limita por cantidad de entradas y por bytes totales; al pasarse
+# de cualquiera de los dos se descartan las entradas usadas hace más tiempo
+class RenderCache:
+    def __init__(self, max_entries=512, max_bytes=64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            # una imagen más grande que toda la cache no se guarda
+            if len(png) > self.max_bytes or self.max_entries <= 0:
+                return png
+            self._entries[key] = png
+            self._bytes += len(png)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= len(old)
+                self.evictions += 1
+            return png
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entradas": len(self._entries),
+                "bytes": self._bytes,
+                "aciertos": self.hits,
+                "fallos": self.misses,
+                "descartes": self.evictions,
+            }
+
+
+# límites configurables con variables de entorno
+render_cache = RenderCache(
+    max_entries=int(os.environ.get("SOLIDLAB_RENDER_CACHE_ENTRIES", 512)),
+    max_bytes=int(float(os.environ.get("SOLIDLAB_RENDER_CACHE_MB", 64)) * 2**20),
+)
+
+
+# Redondea las entradas de una figura para usarlas como llave de la cache.
+# Valores que difieren menos que la resolución producen la misma imagen
+def quantize(*values, decimals=4):
+    # + 0.0 convierte -0.0 en 0.0
+    return tuple(round(float(value), decimals) + 0.0 for value in values)
+
+
+# mismo formato que usa st.pyplot
+@profiled("png")
+def figure_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    return buffer.getvalue()
+
+
+# Muestra la figura identificada por key. Si ya está en la cache se envía el
+# PNG guardado sin llamar a matplotlib; si no, draw(fig, ax) la dibuja sobre la
+# figura de la sesión figure_key y el resultado se guarda
+def show_cached_figure(key, figure_key, draw):
+    png = render_cache.get(key)
+    if png is None:
+        fig, ax = session_subplots(figure_key)
+        draw(fig, ax)
+        png = render_cache.put(key, figure_png(fig))
+    with stage("st.image"):
+        st.image(png, width="stretch")
+
+
+# Igual que show_cached_figure, para figuras con una parte fija y otra que
+# cambia. draw_base(fig, ax) dibuja la parte fija y solo se repite cuando
+# cambia base_key; draw(fig, ax) dibuja la parte variable y devuelve sus
+# artistas, que se quitan antes del siguiente dibujo
+def show_layered_figure(key, figure_key, base_key, draw_base, draw):
+    png = render_cache.get(key)
+    if png is None:
+        figures = st.session_state.setdefault("_figures", {})
+        layers = st.session_state.setdefault("_figure_layers", {})
+        fig = figures.get(figure_key)
+        current_base, artists = layers.get(figure_key, (None, []))
+        if fig is None or not fig.axes or current_base != base_key:
+            fig, ax = session_subplots(figure_key)
+            draw_base(fig, ax)
+        else:
+            ax = fig.axes[0]
+            for artist in artists:
+                artist.remove()
+        layers[figure_key] = (base_key, draw(fig, ax))
+        png = render_cache.put(key, figure_png(fig))
+    with stage("st.image"):
+        st.image(png, width="stretch")
+
+
+# figuras abiertas en pyplot, que solo se liberan con plt.close()
+def _pyplot_figures():
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    return len(pyplot.get_fignums()) if pyplot is not None else 0
+
+
+# memoria residente del proceso en bytes, None si no se puede leer
+def process_rss():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+
+        # pico de memoria, en KB en Linux y en bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+# Conteo de figuras abiertas y memoria asociada, para verificar que el
+# servidor se mantiene estable bajo uso continuo
+def figure_stats():
+    figures = list(_figures)
+    return {
+        "figuras": len(figures),
+        "figuras_pyplot": _pyplot_figures(),
+        "artistas": sum(len(fig.findobj()) for fig in figures),
+        "rss_bytes": process_rss(),
+    }
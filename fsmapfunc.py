@@ -0,0 +1,173 @@
+import matplotlib
+import numpy as np
+from matplotlib.colors import TwoSlopeNorm
+
+from envelopefunc import trace_envelope
+from failurefunc import mohr_batch, rankine_batch, tresca_batch, von_mises_batch
+
+# En este módulo se calculan mapas del factor de seguridad sobre el plano de
+# esfuerzos principales (sigma_1, sigma_2) para cada criterio.
+# El FS no cambia si los esfuerzos y las resistencias se multiplican por el
+# mismo factor, así que el mapa se calcula una sola vez en el plano
+# normalizado u = sigma / resistencia y sirve para cualquier resistencia: al
+# cambiar sigma_yield solo cambia la escala de los ejes. En Mohr el mapa
+# normalizado depende de la razón sigma_uc / sigma_ut
+
+# resistencia con la que se normaliza el plano de cada criterio
+MAP_STRENGTH = {
+    "tresca": "sigma_yield",
+    "von_mises": "sigma_yield",
+    "rankine": "sigma_u",
+    "mohr": "sigma_ut",
+}
+# escala de colores de los mapas: rojo en falla, amarillo en FS = 1
+FS_NORM = TwoSlopeNorm(vmin=0.0, vcenter=1.0, vmax=3.0)
+FS_CMAP = "RdYlGn"
+
+# arriba de este FS el color del mapa ya no cambia; también limita el inverso
+# del FS que se interpola
+FS_CAP = 1e3
+
+
+# FS de estados normalizados (u1, u2) con resistencia unitaria
+def unit_safety_factor(criterion, u1, u2, ratio=None):
+    if criterion == "tresca":
+        return tresca_batch(u1, u2, 1.0)[1]
+    if criterion == "von_mises":
+        return von_mises_batch(u1, u2, 1.0)[1]
+    if criterion == "rankine":
+        return rankine_batch(u1, u2, 1.0)[1]
+    if criterion == "mohr":
+        if ratio is None:
+            raise ValueError("El mapa de Mohr necesita ratio = sigma_uc / sigma_ut")
+        return mohr_batch(u1, u2, ratio, 1.0)[1]
+    raise ValueError(f"Criterio desconocido: {criterion}")
+
+
+# Resistencia que normaliza el plano del criterio y razón sigma_uc / sigma_ut
+# (solo Mohr), a partir de los parámetros del material
+def map_scale(criterion, **material):
+    strength = float(material[MAP_STRENGTH[criterion]])
+    ratio = None
+    if criterion == "mohr":
+        ratio = float(material["sigma_uc"]) / strength
+    return strength, ratio
+
+
+# Mapa del FS en una malla de resolution x resolution puntos sobre
+# [-extent, extent]^2 del plano normalizado. Devuelve (axis, fs), con fs de
+# forma (resolution, resolution), filas según u2 y columnas según u1.
+# La malla se adapta a la frontera FS = 1: el criterio se evalúa en una malla
+# gruesa, una celda de cada tile x tile puntos, y solo las celdas que cruza la
+# frontera (y sus vecinas) se evalúan en todos sus puntos. En el resto se
+# interpola el inverso del FS, que es lineal por tramos (Tresca, Rankine) o
+# suave (von Mises, Mohr) lejos de la frontera. Con tile=1 todo se evalúa
+def safety_factor_map(criterion, resolution=1000, extent=2.0, ratio=None, tile=16):
+    axis = np.linspace(-extent, extent, resolution)
+    nodes = np.unique(np.r_[0:resolution:tile, resolution - 1])
+    coarse_u1, coarse_u2 = np.meshgrid(axis[nodes], axis[nodes])
+    coarse = unit_safety_factor(criterion, coarse_u1, coarse_u2, ratio)
+    inverse = 1.0 / np.clip(coarse, 1.0 / FS_CAP, None)
+
+    # celda gruesa de cada punto fino y peso de la interpolación lineal
+    cell = np.clip(np.searchsorted(nodes, np.arange(resolution), "right") - 1, 0, None)
+    cell = np.minimum(cell, len(nodes) - 2)
+    weight = (np.arange(resolution) - nodes[cell]) / (nodes[cell + 1] - nodes[cell])
+
+    # celdas que cruza la frontera, más una celda alrededor por si la
+    # frontera entra y sale de una celda sin cambiar de lado en las esquinas
+    corners = np.stack(
+        [inverse[:-1, :-1], inverse[:-1, 1:], inverse[1:, :-1], inverse[1:, 1:]]
+    )
+    crossing = (corners.min(axis=0) < 1.0) & (corners.max(axis=0) >= 1.0)
+    padded = np.pad(crossing, 1)
+    near = np.zeros_like(crossing)
+    for di in (0, 1, 2):
+        for dj in (0, 1, 2):
+            near |= padded[di : di + crossing.shape[0], dj : dj + crossing.shape[1]]
+
+    fs = np.empty((resolution, resolution), dtype=np.float32)
+    wx = weight.astype(np.float32)
+    left = inverse[:, cell].astype(np.float32)
+    right = inverse[:, cell + 1].astype(np.float32)
+    # interpolación por bloques de filas para no crear arreglos intermedios
+    # del tamaño de la malla
+    for start in range(0, resolution, 128):
+        rows = slice(start, min(start + 128, resolution))
+        below = cell[rows]
+        wy = weight[rows, None].astype(np.float32)
+        bottom = left[below] + wx * (right[below] - left[below])
+        top = left[below + 1] + wx * (right[below + 1] - left[below + 1])
+        value = bottom + wy * (top - bottom)
+        block = fs[rows]
+        block[...] = np.inf
+        np.divide(1.0, value, out=block, where=value > 0)
+
+        exact = near[below][:, cell]
+        i, j = np.nonzero(exact)
+        block[i, j] = unit_safety_factor(criterion, axis[j], axis[rows][i], ratio)
+    return axis, fs
+
+
+# lado del plano normalizado que cubre el mapa: hasta FS = 0.5 en los
+# criterios dúctiles y en Rankine; en Mohr hasta la resistencia a compresión
+def map_extent(criterion, ratio=None):
+    if criterion == "mohr":
+        return 1.25 * max(1.0, ratio)
+    return 2.0
+
+
+# Líneas de la frontera FS = 1 del plano normalizado, una lista de arreglos
+# (k, 2), trazadas con envelopefunc con la precisión de la malla
+def map_boundary(criterion, extent, resolution, ratio=None):
+    material = {MAP_STRENGTH[criterion]: 1.0}
+    if criterion == "mohr":
+        material["sigma_uc"] = ratio
+    envelope = trace_envelope(
+        criterion, extent / resolution, reach=1.5 * extent, **material
+    )
+    return [envelope.points]
+
+
+# Colores de un mapa del FS como imagen RGBA (uint8), reducida a lo más a
+# max_pixels por lado: la imagen ya tiene la resolución de la pantalla y
+# matplotlib no tiene que remuestrear la malla completa en cada dibujo
+def map_image(fs, max_pixels=800):
+    step = max(1, int(np.ceil(fs.shape[0] / max_pixels)))
+    return matplotlib.colormaps[FS_CMAP](FS_NORM(fs[::step, ::step]), bytes=True)
+
+
+# Dibuja una imagen de map_image en extent = (x0, x1, y0, y1) con la barra de
+# colores del FS
+def plot_fs_image(image, extent, ax, aspect=None):
+    ax.imshow(
+        image,
+        extent=extent,
+        origin="lower",
+        aspect=aspect,
+        interpolation="nearest",
+    )
+    ax.figure.colorbar(
+        matplotlib.cm.ScalarMappable(FS_NORM, matplotlib.colormaps[FS_CMAP]),
+        ax=ax,
+        shrink=0.8,
+    ).set_label("FS")
+
+
+# Dibuja un mapa normalizado (imagen de map_image y frontera de map_boundary)
+# escalado por strength, con el estado (sigma1, sigma2) y su FS
+def plot_fs_map(image, boundary, extent, strength, sigma1, sigma2, fs, label, ax):
+    limit = extent * strength
+    plot_fs_image(image, (-limit, limit, -limit, limit), ax)
+    for line in boundary:
+        ax.plot(line[:, 0] * strength, line[:, 1] * strength, "k", linewidth=1.0)
+    ax.plot([sigma1], [sigma2], "bo", markersize=4)
+    ax.set_title(f"{label}: FS = {fs:.2f}")
+
+    # el estado puede quedar fuera del mapa
+    reach = max(limit, 1.1 * abs(sigma1), 1.1 * abs(sigma2))
+    ax.set_xlim(-reach, reach)
+    ax.set_ylim(-reach, reach)
+    ax.set_aspect("equal")
+    ax.set_xlabel("$\\sigma_1$")
+    ax.set_ylabel("$\\sigma_2$")
@@ -0,0 +1,126 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from bulkfunc import evaluate_states, evaluate_csv, evaluate_npy
+
+# En este módulo se reparte la evaluación de muchos estados de esfuerzo, o de
+# muchos archivos, entre varios procesos. Los resultados se unen en el mismo
+# orden de la entrada, sin importar qué proceso termine primero
+
+RESULTS_SUFFIX = "-resultados.npy"
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _evaluate_chunk(states, theta, material):
+    return evaluate_states(states[:, 0], states[:, 1], states[:, 2], theta, **material)
+
+
+def _evaluate_file(path, out_path, chunk_size, theta, material):
+    if out_path is not None:
+        return evaluate_npy(path, out_path, chunk_size, theta, **material)
+    with open(path, encoding="utf-8") as lines:
+        return evaluate_csv(lines, chunk_size, theta, **material)
+
+
+# Archivo de resultados de cada entrada (None para los .csv):
+# <nombre>-resultados.npy en output_dir o junto a la entrada. Se revisan
+# todos antes de empezar: no se sobrescribe un archivo existente salvo con
+# overwrite, ni se evalúa un archivo de resultados anterior
+def _output_paths(paths, output_dir=None, overwrite=False):
+    outputs = []
+    for path in paths:
+        if not path.endswith(".npy"):
+            outputs.append(None)
+            continue
+        if path.endswith(RESULTS_SUFFIX):
+            raise ValueError(f"{path} ya es un archivo de resultados")
+        name = os.path.basename(path)[:-4] + RESULTS_SUFFIX
+        out_path = os.path.join(output_dir or os.path.dirname(path), name)
+        if os.path.exists(out_path) and not overwrite:
+            raise FileExistsError(f"{out_path} ya existe (use overwrite)")
+        outputs.append(out_path)
+    written = [path for path in outputs if path is not None]
+    if len(set(map(os.path.abspath, written))) < len(written):
+        raise ValueError("Dos entradas escriben el mismo archivo de resultados")
+    return outputs
+
+
+# Evalúa un arreglo (N, 3) de estados repartido en bloques de chunk_size filas.
+# Se puede pasar un executor ya creado para reutilizar los procesos entre
+# llamadas; si no, se crea uno con workers procesos
+def evaluate_parallel(
+    states,
+    workers=None,
+    chunk_size=100_000,
+    theta=None,
+    executor=None,
+    **material,
+):
+    states = np.asarray(states, dtype=float)
+    chunks = [states[i : i + chunk_size] for i in range(0, len(states), chunk_size)]
+    if not chunks:
+        return evaluate_states(np.zeros(0), np.zeros(0), np.zeros(0), theta, **material)
+
+    if executor is None:
+        with ProcessPoolExecutor(workers or default_workers()) as executor:
+            parts = list(
+                executor.map(_evaluate_chunk, chunks, repeat(theta), repeat(material))
+            )
+    else:
+        parts = list(
+            executor.map(_evaluate_chunk, chunks, repeat(theta), repeat(material))
+        )
+
+    # executor.map devuelve los bloques en el orden en que se enviaron
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+# Resultados de cada bloque, en orden. Con executor los bloques se reparten
+# entre procesos, con a lo más window bloques en vuelo para no leer toda la
+# entrada en memoria
+def evaluate_blocks(blocks, evaluate, executor=None, window=1):
+    if executor is None:
+        for block in blocks:
+            yield evaluate(block)
+        return
+
+    pending = []
+    for block in blocks:
+        pending.append(executor.submit(evaluate, block))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+# Evalúa una lista de archivos .csv o .npy, un archivo por proceso.
+# Devuelve los resúmenes en el mismo orden que paths; los .npy escriben sus
+# resultados en <nombre>-resultados.npy, en output_dir o junto al archivo de
+# entrada. Si alguno ya existe no se evalúa nada, salvo con overwrite=True
+def evaluate_files_parallel(
+    paths,
+    workers=None,
+    chunk_size=100_000,
+    theta=None,
+    output_dir=None,
+    overwrite=False,
+    **material,
+):
+    outputs = _output_paths(paths, output_dir, overwrite)
+    with ProcessPoolExecutor(workers or default_workers()) as executor:
+        return list(
+            executor.map(
+                _evaluate_file,
+                paths,
+                outputs,
+                repeat(chunk_size),
+                repeat(theta),
+                repeat(material),
+            )
+        )
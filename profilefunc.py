@@ -0,0 +1,248 @@
+import functools
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# En este módulo se mide, para cada ejecución de una página, el tiempo y la
+# memoria asignada en cada etapa con nombre (esfuerzos principales, dibujo del
+# círculo, flechas, PNG...). Está apagado por defecto y cuando lo está las
+# etapas no hacen nada más que leer una variable de contexto. Se activa por
+# sesión con ?profile=1 en la URL o para todo el servidor con SOLIDLAB_PROFILE=1.
+# Cada ejecución se escribe como una línea JSON en el logger solidlab.profile y
+# se acumula en contadores por página y etapa
+
+logger = logging.getLogger("solidlab.profile")
+
+# ejecución en curso en este hilo (cada sesión corre en su propio hilo)
+_current = ContextVar("solidlab_profile", default=None)
+_lock = threading.Lock()
+_active_runs = 0
+_counters = {}
+
+
+def profiling_enabled():
+    if os.environ.get("SOLIDLAB_PROFILE") == "1":
+        return True
+    import streamlit as st
+
+    return st.query_params.get("profile") == "1"
+
+
+# El panel de la barra lateral muestra y reinicia contadores de todo el
+# servidor, así que además de ?profile=1 el servidor lo tiene que habilitar
+# con SOLIDLAB_PROFILE_PANEL=1
+def profile_panel_enabled():
+    if os.environ.get("SOLIDLAB_PROFILE_PANEL") != "1":
+        return False
+    import streamlit as st
+
+    return st.query_params.get("profile") == "1"
+
+
+# tracemalloc hace más lento a todo el proceso, solo se enciende mientras hay
+# alguna ejecución medida
+def _start_tracing():
+    global _active_runs
+    with _lock:
+        _active_runs += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _stop_tracing():
+    global _active_runs
+    with _lock:
+        _active_runs -= 1
+        if _active_runs == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class _Run:
+    def __init__(self, page):
+        self.page = page
+        self.total = None
+        self.stages = {}
+        # etapas abiertas: [nombre completo, pico de memoria de las etapas hijas]
+        self.stack = []
+
+    def open(self, path):
+        stage = self.stages.setdefault(
+            path, {"llamadas": 0, "s": 0.0, "asignado_kb": 0.0, "pico_kb": 0.0}
+        )
+        stage["llamadas"] += 1
+        return stage
+
+
+# Suma a values el tiempo, la memoria asignada (neta) y el pico de memoria
+# desde la entrada. tracemalloc es global: con varias sesiones medidas a la vez
+# las cifras de memoria incluyen lo que asignan los otros hilos
+@contextmanager
+def _measure(run, path, values):
+    parent = run.stack[-1] if run.stack else None
+    frame = [path, 0]
+    run.stack.append(frame)
+    start_memory, peak = tracemalloc.get_traced_memory()
+    # reset_peak es global: el pico que la etapa padre alcanzó hasta aquí se
+    # guarda antes de reiniciarlo
+    if parent:
+        parent[1] = max(parent[1], peak)
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        run.stack.pop()
+        # el pico se mide desde el inicio de la etapa, incluyendo el de las hijas
+        peak = max(peak, frame[1])
+        if parent:
+            parent[1] = max(parent[1], peak)
+        values["s"] += seconds
+        values["asignado_kb"] += (current - start_memory) / 1024
+        values["pico_kb"] = max(values["pico_kb"], (peak - start_memory) / 1024)
+
+
+# Mide una etapa de la ejecución en curso. Las etapas anidadas se nombran con
+# la ruta completa (plot_element/draw_stress) y las que se repiten en la misma
+# ejecución se suman. Fuera de una ejecución medida no hace nada
+@contextmanager
+def stage(name):
+    run = _current.get()
+    if run is None:
+        yield
+        return
+
+    parent = run.stack[-1][0] if run.stack else ""
+    path = f"{parent}/{name}" if parent else name
+    with _measure(run, path, run.open(path)):
+        yield
+
+
+# decorador equivalente a envolver cada llamada en stage(name)
+def profiled(name=None):
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with stage(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# funciones de los módulos de cálculo que se miden como etapas. Los módulos no
+# dependen de profilefunc: instrument() cambia las funciones del módulo por las
+# versiones con profiled, y las páginas las toman al importarlas en cada
+# ejecución
+INSTRUMENTED = {
+    "stressfunc": (
+        "principal_stress",
+        "transform_sweep",
+        "plot_mohrs_circle",
+        "draw_stress",
+        "plot_element",
+    ),
+    "failurefunc": ("plot_mohrs_circle",),
+}
+
+
+# Envuelve con profiled las funciones de INSTRUMENTED; se puede llamar en cada
+# ejecución, las que ya están envueltas no se vuelven a envolver
+def instrument(functions=INSTRUMENTED):
+    for module_name, names in functions.items():
+        module = importlib.import_module(module_name)
+        for name in names:
+            func = getattr(module, name)
+            if not getattr(func, "_profiled", False):
+                wrapper = profiled()(func)
+                wrapper._profiled = True
+                setattr(module, name, wrapper)
+
+
+# Mide una ejecución completa de page. Si ya hay una ejecución en curso (por
+# ejemplo un fragmento dentro de la página) se mide como una etapa más.
+# Al terminar se escribe el registro en el log, se suma a los contadores y se
+# guarda en la sesión para el panel
+@contextmanager
+def profile_run(page, enabled=None):
+    if _current.get() is not None:
+        with stage(page):
+            yield
+        return
+    if enabled is None:
+        enabled = profiling_enabled()
+    if not enabled:
+        yield
+        return
+
+    run = _Run(page)
+    run.total = {"llamadas": 1, "s": 0.0, "asignado_kb": 0.0, "pico_kb": 0.0}
+    token = _current.set(run)
+    _start_tracing()
+    try:
+        # la ejecución completa es la raíz, sus etapas no llevan prefijo
+        with _measure(run, "", run.total):
+            yield
+    finally:
+        _current.reset(token)
+        _stop_tracing()
+        _finish(run)
+
+
+def _finish(run):
+    record = {
+        "pagina": run.page,
+        "fecha": time.time(),
+        "total": {key: round(value, 6) for key, value in run.total.items()},
+        "etapas": {
+            name: {key: round(value, 6) for key, value in values.items()}
+            for name, values in run.stages.items()
+        },
+    }
+    logger.info(json.dumps(record, ensure_ascii=False))
+
+    with _lock:
+        for name, values in [("total", run.total)] + list(run.stages.items()):
+            counter = _counters.setdefault(
+                (run.page, name), {"llamadas": 0, "s": 0.0, "max_s": 0.0, "runs": 0}
+            )
+            counter["llamadas"] += values["llamadas"]
+            counter["s"] += values["s"]
+            counter["max_s"] = max(counter["max_s"], values["s"])
+            counter["runs"] += 1
+
+    try:
+        import streamlit as st
+
+        history = st.session_state.setdefault("_profile_runs", deque(maxlen=20))
+        history.append(record)
+    except Exception:
+        # fuera de una sesión de Streamlit solo queda el log
+        pass
+
+
+# contadores acumulados del proceso, por página y etapa
+def profile_counters():
+    with _lock:
+        return {
+            f"{page} | {name}": dict(values)
+            for (page, name), values in sorted(_counters.items())
+        }
+
+
+def reset_profile_counters():
+    with _lock:
+        _counters.clear()
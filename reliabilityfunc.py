@@ -0,0 +1,168 @@
+from statistics import NormalDist
+
+import numpy as np
+
+from failurefunc import evaluate_criteria
+
+# En este módulo se estima la probabilidad de falla P_f por Monte Carlo
+# cuando los esfuerzos principales y las resistencias son variables
+# aleatorias. Las muestras se generan y evalúan por bloques con
+# failurefunc.evaluate_criteria y de cada bloque solo se guarda el número de
+# fallas de cada criterio, así que la memoria depende del tamaño de bloque y
+# no del número de muestras. Después de cada bloque se actualiza el intervalo
+# de confianza de Wilson de P_f, y la simulación termina cuando alcanza la
+# precisión pedida o el máximo de muestras. Con la misma semilla y el mismo
+# tamaño de bloque los resultados se repiten exactamente
+
+DISTRIBUTIONS = ("normal", "lognormal")
+# esfuerzos aplicados y resistencias que pueden ser aleatorios
+VARIABLES = ("sigma1", "sigma2", "sigma_yield", "sigma_u", "sigma_uc", "sigma_ut")
+
+
+# Variable aleatoria con media mean y desviación estándar std. Con std = 0 es
+# un valor fijo. La lognormal (solo para medias positivas) evita resistencias
+# negativas cuando la dispersión es grande. Con lower la normal se trunca: las
+# muestras menores que lower se vuelven a generar (mean y std son entonces los
+# de la normal sin truncar)
+class RandomVariable:
+    def __init__(self, mean, std=0.0, distribution="normal", lower=None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(
+                f"distribution debe ser 'normal' o 'lognormal', se dio {distribution!r}"
+            )
+        if std < 0:
+            raise ValueError(f"La desviación estándar no puede ser negativa: {std}")
+        if distribution == "lognormal" and mean <= 0:
+            raise ValueError(f"La distribución lognormal necesita media > 0: {mean}")
+        if lower is not None and mean <= lower:
+            raise ValueError(f"La media debe ser mayor que lower: {mean} <= {lower}")
+        self.mean = float(mean)
+        self.std = float(std)
+        self.distribution = distribution
+        self.lower = None if lower is None else float(lower)
+
+    def sample(self, rng, size):
+        if self.std == 0:
+            return np.full(size, self.mean)
+        if self.distribution == "normal":
+            values = rng.normal(self.mean, self.std, size)
+            if self.lower is not None:
+                below = np.flatnonzero(values < self.lower)
+                while len(below):
+                    values[below] = rng.normal(self.mean, self.std, len(below))
+                    below = below[values[below] < self.lower]
+            return values
+        # parámetros del logaritmo con la misma media y desviación
+        log_var = np.log1p((self.std / self.mean) ** 2)
+        log_mean = np.log(self.mean) - log_var / 2.0
+        return rng.lognormal(log_mean, np.sqrt(log_var), size)
+
+
+# Intervalo de Wilson (low, high) de una proporción con failures éxitos en
+# samples intentos. A diferencia del intervalo normal no colapsa a cero
+# cuando todavía no hay fallas, que es lo común con P_f pequeñas
+def wilson_interval(failures, samples, confidence=0.95):
+    if samples == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    p = failures / samples
+    denominator = 1.0 + z * z / samples
+    center = (p + z * z / (2 * samples)) / denominator
+    half = z * np.sqrt(p * (1 - p) / samples + z * z / (4 * samples**2)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+# Estimación de P_f de un criterio después de samples muestras
+class Estimate:
+    def __init__(self, failures, samples, confidence):
+        self.failures = int(failures)
+        self.samples = int(samples)
+        self.confidence = confidence
+        self.probability = self.failures / self.samples if self.samples else 0.0
+        self.low, self.high = wilson_interval(self.failures, self.samples, confidence)
+
+    @property
+    def half_width(self):
+        return (self.high - self.low) / 2.0
+
+    # semiancho relativo a P_f; infinito mientras no haya fallas
+    @property
+    def relative_half_width(self):
+        if self.failures == 0:
+            return np.inf
+        return self.half_width / self.probability
+
+
+# Convierte los valores de variables (números o RandomVariable) en
+# RandomVariable. sigma1 y sigma2 son obligatorios; las resistencias que se
+# den definen los criterios, como en evaluate_criteria
+def _random_variables(variables):
+    unknown = [name for name in variables if name not in VARIABLES]
+    if unknown:
+        raise ValueError(f"Variables desconocidas: {', '.join(unknown)}")
+    missing = [name for name in ("sigma1", "sigma2") if name not in variables]
+    if missing:
+        raise ValueError(f"Faltan las variables {', '.join(missing)}")
+    return {
+        name: (
+            value if isinstance(value, RandomVariable) else RandomVariable(value, 0.0)
+        )
+        for name, value in variables.items()
+        if value is not None
+    }
+
+
+# Estimaciones {criterio: Estimate} después de cada bloque de chunk_size
+# muestras. Termina cuando todos los criterios tienen un semiancho relativo
+# menor que relative (o un semiancho menor que absolute, si se da), o al
+# llegar a max_samples
+def iter_failure_probability(
+    variables,
+    chunk_size=100_000,
+    max_samples=10_000_000,
+    relative=0.05,
+    absolute=None,
+    confidence=0.95,
+    seed=None,
+):
+    variables = _random_variables(variables)
+    rng = np.random.default_rng(seed)
+    failures = None
+    samples = 0
+    while samples < max_samples:
+        size = min(chunk_size, max_samples - samples)
+        # el orden de VARIABLES fija el orden de las muestras para la semilla
+        drawn = {
+            name: variables[name].sample(rng, size)
+            for name in VARIABLES
+            if name in variables
+        }
+        criteria = evaluate_criteria(**drawn)
+        if not criteria:
+            raise ValueError("Se necesita al menos una resistencia para evaluar")
+        if failures is None:
+            failures = dict.fromkeys(criteria, 0)
+        for name, (failure_bool, _) in criteria.items():
+            failures[name] += int(np.count_nonzero(failure_bool))
+        samples += size
+
+        estimates = {
+            name: Estimate(count, samples, confidence)
+            for name, count in failures.items()
+        }
+        yield estimates
+        if all(
+            estimate.relative_half_width <= relative
+            or (absolute is not None and estimate.half_width <= absolute)
+            for estimate in estimates.values()
+        ):
+            return
+
+
+# Corre iter_failure_probability hasta el final y devuelve la última
+# estimación
+def failure_probability(variables, **options):
+    estimates = None
+    for estimates in iter_failure_probability(variables, **options):
+        pass
+    return estimates
@@ -0,0 +1,106 @@
+import numpy as np
+
+from bulkfunc import evaluate_strains, iter_csv_chunks
+
+# En este módulo se reducen lecturas de rosetas de deformación a estados de
+# deformación (epsilon_x, epsilon_y, gamma_xy) y de ahí a deformaciones
+# principales. Cada galga a un ángulo phi mide
+#     epsilon(phi) = epsilon_x cos²phi + epsilon_y sin²phi + gamma_xy sin phi cos phi
+# Con tres galgas el sistema tiene solución única; con más, se resuelve por
+# mínimos cuadrados. La pseudo-inversa se calcula una sola vez por roseta y
+# cada bloque de lecturas se resuelve con un solo producto de matrices, por lo
+# que la memoria solo depende del tamaño de bloque
+
+RECTANGULAR = (0.0, 45.0, 90.0)
+DELTA = (0.0, 60.0, 120.0)
+
+ROSETTE_COLUMNS = ("epsilon_x", "epsilon_y", "gamma_xy")
+
+
+# matriz (k, 3) que lleva (epsilon_x, epsilon_y, gamma_xy) a las k lecturas
+def rosette_matrix(angles):
+    phi = np.radians(np.asarray(angles, dtype=float))
+    return np.column_stack(
+        [np.cos(phi) ** 2, np.sin(phi) ** 2, np.sin(phi) * np.cos(phi)]
+    )
+
+
+class Rosette:
+    def __init__(self, angles):
+        self.angles = tuple(float(angle) for angle in angles)
+        self.matrix = rosette_matrix(self.angles)
+        if len(self.angles) < 3 or np.linalg.matrix_rank(self.matrix) < 3:
+            raise ValueError(
+                "Se necesitan al menos tres galgas a ángulos distintos (módulo 180°), "
+                f"se dieron {self.angles}"
+            )
+        # (3, k): lecturas -> deformaciones, solución de mínimos cuadrados
+        self.solver = np.linalg.pinv(self.matrix)
+
+    @property
+    def overdetermined(self):
+        return len(self.angles) > 3
+
+    # readings: arreglo (N, k) con una columna por galga, en el orden de angles.
+    # Devuelve (epsilon_x, epsilon_y, gamma_xy) y, si hay más de tres galgas,
+    # el residuo rms de cada fila (diferencia entre lecturas y ajuste)
+    def solve(self, readings):
+        readings = np.asarray(readings, dtype=float)
+        strains = readings @ self.solver.T
+        residual = None
+        if self.overdetermined:
+            fitted = strains @ self.matrix.T
+            residual = np.sqrt(np.mean((readings - fitted) ** 2, axis=1))
+        return strains[:, 0], strains[:, 1], strains[:, 2], residual
+
+
+# Resultados de un bloque de lecturas: deformaciones en x-y, residuo (si la
+# roseta tiene más de tres galgas) y las columnas de evaluate_strains
+def reduce_readings(readings, rosette, theta=None):
+    epsilon_x, epsilon_y, gamma_xy, residual = rosette.solve(readings)
+    results = dict(zip(ROSETTE_COLUMNS, (epsilon_x, epsilon_y, gamma_xy)))
+    if residual is not None:
+        results["residuo_rms"] = residual
+    results.update(evaluate_strains(epsilon_x, epsilon_y, gamma_xy, theta))
+    return results
+
+
+# columnas de las galgas por defecto: seguidas, después de la de tiempo
+def gauge_columns_for(rosette, gauge_columns=None, time_column=None):
+    if gauge_columns is None:
+        start = 0 if time_column is None else time_column + 1
+        gauge_columns = range(start, start + len(rosette.angles))
+    gauge_columns = list(gauge_columns)
+    if len(gauge_columns) != len(rosette.angles):
+        raise ValueError(
+            f"La roseta tiene {len(rosette.angles)} galgas pero se dieron "
+            f"{len(gauge_columns)} columnas"
+        )
+    return gauge_columns
+
+
+# Resultados de un bloque (N, columnas) de un registro: las galgas se toman de
+# gauge_columns, en el orden de los ángulos de la roseta, y time_column
+# (opcional) se copia a la salida como "t"
+def reduce_block(data, rosette, gauge_columns, time_column=None, theta=None):
+    results = reduce_readings(data[:, gauge_columns], rosette, theta)
+    if time_column is not None:
+        results = {"t": data[:, time_column], **results}
+    return results
+
+
+# Procesa un registro csv por bloques y entrega los resultados de cada bloque.
+# Solo se guarda un bloque a la vez
+def reduce_log(
+    lines,
+    rosette,
+    gauge_columns=None,
+    time_column=None,
+    chunk_size=100_000,
+    delimiter=",",
+    theta=None,
+):
+    gauge_columns = gauge_columns_for(rosette, gauge_columns, time_column)
+    used = gauge_columns + ([] if time_column is None else [time_column])
+    for data in iter_csv_chunks(lines, chunk_size, delimiter, max(used) + 1):
+        yield reduce_block(data, rosette, gauge_columns, time_column, theta)
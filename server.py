@@ -0,0 +1,272 @@
+import argparse
+import functools
+import io
+import json
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from bulkfunc import criteria_material, drop_criteria, evaluate_block
+from parallelfunc import default_workers, evaluate_blocks
+
+# Servicio HTTP local con los mismos cálculos del dashboard, para otras
+# herramientas. Solo usa la librería estándar y numpy.
+#
+#   POST /evaluate  evalúa un lote de estados. Dos formatos de entrada:
+#     - JSON: {"states": [[sigma_x, sigma_y, tau_xy], ...], "theta": 30,
+#       "strain": false, "criteria": ["tresca"], "sigma_yield": 250, ...}
+#       responde {"rows": N, "columns": {"sigma_1": [...], ...}}; los
+#       factores de seguridad infinitos se escriben como null
+#     - binario: cuerpo .npy de forma (N, 3) con Content-Type
+#       application/x-npy y las opciones en la URL
+#       (/evaluate?theta=30&sigma_yield=250); responde un .npy estructurado,
+#       un campo por columna
+#   GET /health     estado del servicio
+#
+# Los procesos se crean una sola vez al iniciar y se reutilizan en todas las
+# solicitudes; los lotes pequeños se evalúan en el hilo de la solicitud porque
+# enviarlos a otro proceso cuesta más que calcularlos. Uso:
+#     python server.py --port 8765 --workers 4
+
+NPY_TYPE = "application/x-npy"
+OPTIONS = (
+    "theta",
+    "strain",
+    "criteria",
+    "sigma_yield",
+    "sigma_u",
+    "sigma_uc",
+    "sigma_ut",
+)
+
+
+# opciones de la URL de una solicitud binaria, con los mismos nombres que en JSON
+def _query_options(query):
+    values = {key: items[-1] for key, items in parse_qs(query).items()}
+    options = {}
+    for key, value in values.items():
+        if key == "strain":
+            if value.lower() in ("1", "true", "si", "sí"):
+                options[key] = True
+            elif value.lower() in ("0", "false", "no"):
+                options[key] = False
+            else:
+                raise ValueError(f"strain debe ser true o false, se dio {value!r}")
+        elif key == "criteria":
+            options[key] = [name for name in value.split(",") if name]
+        else:
+            options[key] = value
+    return options
+
+
+def _read_states(body, content_type, query):
+    if content_type == NPY_TYPE:
+        try:
+            states = np.load(io.BytesIO(body), allow_pickle=False)
+        except ValueError as error:
+            raise ValueError(f"Cuerpo .npy inválido: {error}") from error
+        options = _query_options(query)
+    else:
+        try:
+            options = json.loads(body)
+            states = np.asarray(options.pop("states"), dtype=float)
+        except (ValueError, TypeError, KeyError, AttributeError) as error:
+            raise ValueError(f"JSON inválido o sin 'states': {error!r}") from error
+
+    unknown = set(options) - set(OPTIONS)
+    if unknown:
+        raise ValueError(f"Opciones desconocidas: {', '.join(sorted(unknown))}")
+    states = np.asarray(states, dtype=float)
+    if states.size == 0:
+        states = states.reshape(0, 3)
+    if states.ndim != 2 or states.shape[1] != 3:
+        raise ValueError(
+            f"Se esperaban estados de forma (N, 3), se recibió {states.shape}"
+        )
+    return states, options
+
+
+# columna para JSON, con null en lugar de inf/nan (que JSON no admite)
+def _json_column(values):
+    if values.dtype.kind == "f" and not np.isfinite(values).all():
+        return [value if math.isfinite(value) else None for value in values.tolist()]
+    return values.tolist()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SolidLab"
+    # encabezados y cuerpo van en escrituras separadas; con Nagle las
+    # respuestas pequeñas esperan ~40 ms el ACK retrasado del cliente
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="application/json; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, document):
+        self._send(status, json.dumps(document, ensure_ascii=False).encode())
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"ok": True, "workers": self.server.workers})
+        else:
+            self._send_json(404, {"error": "Ruta no encontrada"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/evaluate":
+            self._send_json(404, {"error": "Ruta no encontrada"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # sin un largo válido no se sabe dónde termina el cuerpo
+            self.close_connection = True
+            self._send_json(400, {"error": "Content-Length inválido"})
+            return
+        if length > self.server.max_bytes:
+            # el cuerpo no se lee, se cierra la conexión
+            self.close_connection = True
+            self._send_json(413, {"error": "Solicitud demasiado grande"})
+            return
+        body = self.rfile.read(length)
+        content_type = self.headers.get_content_type()
+
+        try:
+            states, options = _read_states(body, content_type, url.query)
+            results = self.server.evaluate(states, options)
+        except (ValueError, TypeError) as error:
+            self._send_json(400, {"error": str(error)})
+            return
+
+        if content_type == NPY_TYPE:
+            rows = len(states)
+            table = np.empty(
+                rows, dtype=[(name, values.dtype) for name, values in results.items()]
+            )
+            for name, values in results.items():
+                table[name] = values
+            buffer = io.BytesIO()
+            np.save(buffer, table, allow_pickle=False)
+            self._send(200, buffer.getvalue(), NPY_TYPE)
+        else:
+            columns = {name: _json_column(values) for name, values in results.items()}
+            self._send_json(200, {"rows": len(states), "columns": columns})
+
+
+class EvaluationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        workers=None,
+        chunk_size=100_000,
+        parallel_rows=200_000,
+        max_bytes=256 * 2**20,
+        verbose=False,
+    ):
+        super().__init__(address, Handler)
+        self.workers = workers or default_workers()
+        self.chunk_size = chunk_size
+        self.parallel_rows = parallel_rows
+        self.max_bytes = max_bytes
+        self.verbose = verbose
+        self.executor = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+
+    def evaluate(self, states, options):
+        # solo booleanos de JSON: bool("false") sería True
+        strain = options.get("strain", False)
+        if not isinstance(strain, bool):
+            raise ValueError(f"strain debe ser true o false, se dio {strain!r}")
+        theta = options.get("theta")
+        theta = None if theta is None else float(theta)
+        parameters = {
+            key: options.get(key)
+            for key in ("sigma_yield", "sigma_u", "sigma_uc", "sigma_ut")
+        }
+        if strain and options.get("criteria"):
+            raise ValueError("Los criterios de falla solo se aplican a esfuerzos")
+        criteria, material = criteria_material(
+            [] if strain else options.get("criteria"), **parameters
+        )
+        evaluate = functools.partial(
+            evaluate_block, theta=theta, strain=strain, **material
+        )
+
+        if self.executor is None or len(states) < self.parallel_rows:
+            results = evaluate(states)
+        else:
+            blocks = (
+                states[i : i + self.chunk_size]
+                for i in range(0, len(states), self.chunk_size)
+            )
+            parts = list(evaluate_blocks(blocks, evaluate, self.executor, self.workers))
+            results = {
+                name: np.concatenate([part[name] for part in parts])
+                for name in parts[0]
+            }
+        return drop_criteria(results, criteria)
+
+    def server_close(self):
+        super().server_close()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servicio HTTP local para evaluar lotes de estados de esfuerzo"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument(
+        "--parallel-rows",
+        type=int,
+        default=200_000,
+        help="lotes con menos filas se evalúan sin usar los procesos",
+    )
+    parser.add_argument("--max-mb", type=float, default=256)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = EvaluationServer(
+        (args.host, args.port),
+        args.workers,
+        args.chunk_size,
+        args.parallel_rows,
+        int(args.max_mb * 2**20),
+        args.verbose,
+    )
+    host, port = server.server_address[:2]
+    print(
+        f"Escuchando en http://{host}:{port} con {server.workers} procesos",
+        file=sys.stderr,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,18 @@
 import streamlit as st
+from profilefunc import (
+    instrument,
+    profile_panel_enabled,
+    profile_run,
+    profiling_enabled,
+)
+from startupfunc import page_timer, start_warm_up
+
+# matplotlib se prepara en segundo plano mientras se muestra la primera página
+start_warm_up()
+# etapas de los módulos de cálculo, solo cuando se mide la ejecución: importar
+# stressfunc y failurefunc carga numpy antes de mostrar la portada
+if profiling_enabled():
+    instrument()
 
 
 cover_page = st.Page("cover.py", title="Bienvenidos")
@@ -7,13 +21,72 @@ strain_transf_page = st.Page(
     "strain-transf.py", title="2. Transformación de deformaciones"
 )
 failure_page = st.Page("failure.py", title="3. Criterios de falla")
+bulk_page = st.Page("bulk-stress.py", title="4. Análisis masivo de esfuerzos")
+sweep_page = st.Page("sweep-stress.py", title="5. Barrido de cargas")
 
 pg = st.navigation(
     {
         "Inicio": [cover_page],
-        "Aplicaciones": [stress_transf_page, strain_transf_page, failure_page],
+        "Aplicaciones": [
+            stress_transf_page,
+            strain_transf_page,
+            failure_page,
+            bulk_page,
+            sweep_page,
+        ],
     }
 )
-pg.run()
+with page_timer(pg.title), profile_run(pg.title):
+    pg.run()
+
+# panel oculto de diagnóstico, se activa agregando ?debug=1 a la URL
+if st.query_params.get("debug") == "1":
+    from figurefunc import figure_stats, render_cache
+    from startupfunc import startup_report
+
+    with st.sidebar.expander("Diagnóstico"):
+        stats = figure_stats()
+        st.metric("Figuras abiertas", stats["figuras"])
+        st.metric("Figuras en pyplot", stats["figuras_pyplot"])
+        st.metric("Artistas en figuras", stats["artistas"])
+        if stats["rss_bytes"] is not None:
+            st.metric("Memoria del proceso", f"{stats['rss_bytes'] / 2**20:.1f} MB")
+        cache = render_cache.stats()
+        st.metric("Imágenes en cache", cache["entradas"])
+        st.metric("Cache de imágenes", f"{cache['bytes'] / 2**20:.1f} MB")
+        st.metric("Aciertos / fallos", f"{cache['aciertos']} / {cache['fallos']}")
+        st.write("Arranque")
+        st.json(startup_report(), expanded=False)
+
+# panel oculto de perfil por etapas, se activa agregando ?profile=1 a la URL
+# si el servidor corre con SOLIDLAB_PROFILE_PANEL=1
+if profile_panel_enabled():
+    from profilefunc import profile_counters, reset_profile_counters
+
+    with st.sidebar.expander("Perfil de ejecución"):
+        runs = st.session_state.get("_profile_runs", [])
+        if runs:
+            ultimo = runs[-1]
+            st.write(f"Última ejecución: {ultimo['pagina']}")
+            st.dataframe(
+                [
+                    {
+                        "etapa": nombre,
+                        "llamadas": etapa["llamadas"],
+                        "ms": etapa["s"] * 1e3,
+                        "asignado KB": etapa["asignado_kb"],
+                        "pico KB": etapa["pico_kb"],
+                    }
+                    for nombre, etapa in [("total", ultimo["total"])]
+                    + list(ultimo["etapas"].items())
+                ],
+                hide_index=True,
+            )
+            st.write("Ejecuciones anteriores de la sesión")
+            st.json(list(runs)[:-1], expanded=False)
+        st.write("Contadores del servidor")
+        st.json(profile_counters(), expanded=False)
+        if st.button("Reiniciar contadores"):
+            reset_profile_counters()
 
 st.set_page_config(page_title="SolidLab")
@@ -0,0 +1,101 @@
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# En este módulo se prepara matplotlib una sola vez por proceso y se mide el
+# tiempo de arranque de cada página. Solo usa la librería estándar para que
+# importarlo desde sm-dashboard.py no cueste nada
+
+logger = logging.getLogger("solidlab.startup")
+
+_process_start = time.perf_counter()
+_lock = threading.Lock()
+_warm_up_thread = None
+_warm_up_seconds = None
+_page_reports = {}
+
+
+# importa matplotlib, fija el backend y la fuente, y construye la cache de
+# fuentes. Es lo que más tarda en el primer dibujo de una página
+def _warm_up():
+    global _warm_up_seconds
+    start = time.perf_counter()
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    matplotlib.rcParams["font.family"] = "monospace"
+
+    from matplotlib import font_manager
+    from matplotlib.backends import backend_agg  # noqa: F401
+    from matplotlib import figure  # noqa: F401
+
+    font_manager.findfont(matplotlib.rcParams["font.family"][0])
+
+    _warm_up_seconds = time.perf_counter() - start
+    logger.info("matplotlib listo en %.3f s", _warm_up_seconds)
+
+
+# Inicia la preparación en un hilo aparte, una sola vez por proceso. La portada
+# se muestra sin esperar a que termine
+def start_warm_up():
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=_warm_up, name="solidlab-warm-up", daemon=True
+            )
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+# bloquea hasta que matplotlib esté listo; se llama antes de crear una figura
+def wait_warm_up():
+    thread = start_warm_up()
+    if thread is not threading.current_thread():
+        thread.join()
+
+
+# Mide cada ejecución de una página: duración, módulos nuevos en el proceso
+# durante la ejecución (incluye los que importe la preparación en segundo
+# plano) y, en la primera, el tiempo desde el arranque del proceso
+@contextmanager
+def page_timer(name):
+    modules = set(sys.modules)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        imported = sorted(
+            {module.split(".")[0] for module in set(sys.modules) - modules}
+        )
+        with _lock:
+            report = _page_reports.get(name)
+            if report is None:
+                report = _page_reports[name] = {
+                    "primer_run_s": end - start,
+                    "desde_arranque_s": end - _process_start,
+                    "modulos_nuevos": imported,
+                    "runs": 0,
+                }
+                logger.info(
+                    "primera ejecución de %s: %.3f s (%.3f s desde el arranque), "
+                    "importó %s",
+                    name,
+                    end - start,
+                    end - _process_start,
+                    ", ".join(imported) or "nada",
+                )
+            report["runs"] += 1
+            report["ultimo_run_s"] = end - start
+
+
+def startup_report():
+    with _lock:
+        return {
+            "warm_up_s": _warm_up_seconds,
+            "paginas": {name: dict(report) for name, report in _page_reports.items()},
+        }
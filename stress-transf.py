@@ -1,12 +1,14 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
 from stressfunc import (
-    transform_stress,
+    transform_sweep,
+    sweep_lookup,
     principal_stress,
     plot_mohrs_circle,
-    draw_stress,
+    plot_element,
 )
+from figurefunc import quantize, show_cached_figure, show_layered_figure
+from chartfunc import mohr_element_chart
+from profilefunc import profile_run
 
 
 def sync_from_text():
@@ -17,9 +19,14 @@ def sync_from_slider():
     st.session_state.text_theta = st.session_state.slider_theta
 
 
-## ----- Aqui inicia el codigo del dashboard streamlit -----
+# transformación para todos los ángulos, se calcula una vez por estado y se
+# comparte entre sesiones. Al mover el slider solo se busca en la tabla
+@st.cache_resource(max_entries=256, show_spinner=False)
+def angle_sweep(sigma_x, sigma_y, tau_xy):
+    return transform_sweep(sigma_x, sigma_y, tau_xy)
+
 
-plt.rcParams["font.family"] = "monospace"
+## ----- Aqui inicia el codigo del dashboard streamlit -----
 
 st.title("Transformación de esfuerzos")
 st.set_page_config(page_title="Transformación de esfuerzos", layout="wide")
@@ -64,250 +71,149 @@ with col_data:
         with col3:
             st.metric("$\\theta_\\tau$", f"{theta_tau:.2f}°")
 
-    col1, col2 = st.columns([0.7, 0.3])
-
     if "slider_theta" not in st.session_state:
         st.session_state["slider_theta"] = 0.0
     if "text_theta" not in st.session_state:
         st.session_state["text_theta"] = 0.0
 
-    with col1:
-        # slider para el angulo
-        theta = st.slider(
-            "Ángulo $\\theta$",
-            min_value=-180.0,
-            max_value=180.0,
-            format="%.2f°",
-            step=1.0,
-            key="slider_theta",
-            value=st.session_state["slider_theta"],
-            # on_change=sync_from_slider,
-        )
-
-    # corregir para que acepte mas de un numero
-    with col2:
-        theta_text = st.number_input(
-            label="Ángulo $\\theta$",
-            label_visibility="hidden",
-            key="text_theta",
-            min_value=-180.0,
-            max_value=180.0,
-            step=1.0,
-            value=st.session_state["slider_theta"],
-            on_change=sync_from_text,
-        )
-
-    sigma_x_prime, sigma_y_prime, tau_x_y_prime = transform_stress(
-        sigma_x, sigma_y, tau_xy, theta
-    )
-
-    # container esfuerzos en un angulo
-    with st.container(border=True):
-        st.write(f"Esfuerzos en el angulo {theta:.1f}°")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("$\sigma_{x'}$", f"{sigma_x_prime:.2f}")
-        with col2:
-            st.metric("$\sigma_{y'}$", f"{sigma_y_prime:.2f}")
-        with col3:
-            st.metric("$\\tau_{xy'}$", f"{tau_x_y_prime:.2f}")
-
 with col_graphs:
-    fig, ax_mohr = plt.subplots()
-    plt.subplots_adjust(bottom=0.25)
-    x_axis_label = "$\sigma$"
-    y_axis_label = "$\\tau$"
-
-    # # Initial Mohr's Circle plot
-    plot_mohrs_circle(
-        sigma_x, sigma_y, tau_xy, theta, x_axis_label, y_axis_label, ax_mohr
-    )
-
-    # ojo que se cambia el signo del cortante para coincidir con el metodo I del Popov
-    (punto,) = ax_mohr.plot(
-        [sigma_x_prime], [-tau_x_y_prime], "bo", markersize=4, label="Transformado"
-    )
-    ax_mohr.plot(
-        [sigma_x, sigma_x_prime], [tau_xy, -tau_x_y_prime], linewidth=1.0, color="b"
-    )
-    ax_mohr.legend(loc=8, bbox_to_anchor=(0.5, -0.2), ncols=2, frameon=False)
-
-    st.pyplot(fig)
-
-    # dibujo de elemento en rotacion
-    fig2, ax_square = plt.subplots()
-    puntos = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1], [-1, -1]])
-    theta_rad = np.radians(-theta)
-    rotmat = np.array(
-        [
-            [np.cos(theta_rad), -np.sin(theta_rad)],
-            [np.sin(theta_rad), np.cos(theta_rad)],
-        ]
-    )
-
-    # calculo de puntos del elemento cuadrado según la rotación theta
-    puntos_rot = np.dot(puntos, rotmat)
-
-    # ejes que rotan
-    padding = 0.2
-    ejes_prima = np.array([[2, 0], [0, 0], [0, 2]])
-    ejes_text_prima = np.array(
-        [
-            [ejes_prima[0][0], ejes_prima[0][1] - padding / 2.0],
-            [ejes_prima[2][0] + padding / 4.0, ejes_prima[2][1]],
-        ]
-    )
-    ejes_prima = np.dot(ejes_prima, rotmat)
-    ejes_text_prima = np.dot(ejes_text_prima, rotmat)
-
-    ax_square.plot(puntos_rot[:, 0], puntos_rot[:, 1])
-    ax_square.plot(ejes_prima[:, 0], ejes_prima[:, 1], color="r", linewidth="1")
-
-    ax_square.text(
-        ejes_text_prima[0][0],
-        ejes_text_prima[0][1],
-        "x'",
-        rotation=theta,
-        color="r",
-    )
-    ax_square.text(
-        ejes_text_prima[1][0],
-        ejes_text_prima[1][1],
-        "y'",
-        rotation=theta,
-        color="r",
-    )
-
-    # draw normal stresses
-    arrow_len_max = 0.5
-    x_ini = 1
-    y_ini = 0
-    max_normal = max(abs(sigma_1), abs(sigma_2))
-
-    # sigma_x_prime, right
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        max_normal,
-        sigma_x_prime,
-        "right",
-        "normal",
-        ax_square,
-    )
-
-    # sigma_y_prime, top
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        max_normal,
-        sigma_y_prime,
-        "top",
-        "normal",
-        ax_square,
-    )
-
-    # sigma_x_prime, left
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        max_normal,
-        sigma_x_prime,
-        "left",
-        "normal",
-        ax_square,
-    )
-
-    # sigma_y_prime, bottom
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        max_normal,
-        sigma_y_prime,
-        "bottom",
-        "normal",
-        ax_square,
-    )
-
-    # draw shear stresses
-    padding = 0.1
-    arrow_len_max = 1.5
-    x_ini = 1
-    y_ini = 0
-
-    # tay_xy_prime, right
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        abs(tau_max),
-        tau_x_y_prime,
-        "right",
-        "shear",
-        ax_square,
+    renderizado = st.radio(
+        "Gráficos",
+        ["Imagen", "Interactivo"],
+        horizontal=True,
+        key="renderizado",
+        help="En modo interactivo el ángulo se cambia con el control del gráfico "
+        "y todo se actualiza en el navegador",
     )
 
-    # tay_xy_prime, top
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        abs(tau_max),
-        tau_x_y_prime,
-        "top",
-        "shear",
-        ax_square,
-    )
 
-    # tay_xy_prime, left
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        abs(tau_max),
-        tau_x_y_prime,
-        "left",
-        "shear",
-        ax_square,
-    )
+# Todo lo que depende del ángulo se ejecuta como fragmento: al mover el slider
+# solo se vuelve a ejecutar esta función, sin recalcular los esfuerzos
+# principales ni redibujar el resto de la página
+@st.fragment
+@profile_run("stress-transf.angle_section")
+def angle_section():
+    with col_data:
+        col1, col2 = st.columns([0.7, 0.3])
 
-    # tay_xy_prime, bottom
-    draw_stress(
-        padding,
-        arrow_len_max,
-        theta,
-        x_ini,
-        y_ini,
-        abs(tau_max),
-        tau_x_y_prime,
-        "bottom",
-        "shear",
-        ax_square,
-    )
+        with col1:
+            # slider para el angulo
+            theta = st.slider(
+                "Ángulo $\\theta$",
+                min_value=-180.0,
+                max_value=180.0,
+                format="%.2f°",
+                step=1.0,
+                key="slider_theta",
+                value=st.session_state["slider_theta"],
+                # on_change=sync_from_slider,
+            )
+
+        # corregir para que acepte mas de un numero
+        with col2:
+            theta_text = st.number_input(
+                label="Ángulo $\\theta$",
+                label_visibility="hidden",
+                key="text_theta",
+                min_value=-180.0,
+                max_value=180.0,
+                step=1.0,
+                value=st.session_state["slider_theta"],
+                on_change=sync_from_text,
+            )
+
+        sweep = angle_sweep(sigma_x, sigma_y, tau_xy)
+        sigma_x_prime, sigma_y_prime, tau_x_y_prime = sweep_lookup(
+            sweep, sigma_x, sigma_y, tau_xy, theta
+        )
 
-    ax_square.set_aspect("equal")
-    ax_square.set(xlim=(-2, 2))
-    ax_square.set(ylim=(-2, 2))
-    ax_square.spines[["right", "top"]].set_visible(False)
-    ax_square.spines["left"].set_position("zero")
-    ax_square.spines["bottom"].set_position("zero")
-    ax_square.xaxis.set_ticks([])
-    ax_square.yaxis.set_ticks([])
-    st.pyplot(fig2)
+        # container esfuerzos en un angulo
+        with st.container(border=True):
+            st.write(f"Esfuerzos en el angulo {theta:.1f}°")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("$\sigma_{x'}$", f"{sigma_x_prime:.2f}")
+            with col2:
+                st.metric("$\sigma_{y'}$", f"{sigma_y_prime:.2f}")
+            with col3:
+                st.metric("$\\tau_{xy'}$", f"{tau_x_y_prime:.2f}")
+
+    with col_graphs:
+
+        # circulo de Mohr, no depende del ángulo
+        def draw_mohr_base(fig, ax_mohr):
+            fig.subplots_adjust(bottom=0.25)
+            x_axis_label = "$\sigma$"
+            y_axis_label = "$\\tau$"
+
+            # # Initial Mohr's Circle plot
+            plot_mohrs_circle(
+                sigma_x, sigma_y, tau_xy, theta, x_axis_label, y_axis_label, ax_mohr
+            )
+
+        # punto transformado, lo único que cambia con el ángulo
+        def draw_mohr(fig, ax_mohr):
+            # ojo que se cambia el signo del cortante para coincidir con el metodo I del Popov
+            (punto,) = ax_mohr.plot(
+                [sigma_x_prime],
+                [-tau_x_y_prime],
+                "bo",
+                markersize=4,
+                label="Transformado",
+            )
+            (linea,) = ax_mohr.plot(
+                [sigma_x, sigma_x_prime],
+                [tau_xy, -tau_x_y_prime],
+                linewidth=1.0,
+                color="b",
+            )
+            leyenda = ax_mohr.legend(
+                loc=8, bbox_to_anchor=(0.5, -0.2), ncols=2, frameon=False
+            )
+            return [punto, linea, leyenda]
+
+        # dibujo de elemento en rotacion
+        def draw_element(fig, ax_square):
+            plot_element(
+                sigma_x_prime,
+                sigma_y_prime,
+                tau_x_y_prime,
+                theta,
+                max(abs(sigma_1), abs(sigma_2)),
+                abs(tau_max),
+                ax_square,
+            )
+
+        if renderizado == "Interactivo":
+            chart = mohr_element_chart(
+                sigma_x,
+                sigma_y,
+                tau_xy,
+                sweep,
+                theta,
+                max(abs(sigma_1), abs(sigma_2)),
+                abs(tau_max),
+                "σ",
+                "τ",
+            )
+            st.altair_chart(chart, width="content")
+        else:
+            # las figuras solo dependen del estado y del ángulo, si ya se
+            # dibujaron para estos valores se usa la imagen guardada
+            estado = quantize(sigma_x, sigma_y, tau_xy)
+            angulo = quantize(theta)
+            show_layered_figure(
+                ("esfuerzos", "mohr") + estado + angulo,
+                "mohr_esfuerzos",
+                ("esfuerzos",) + estado,
+                draw_mohr_base,
+                draw_mohr,
+            )
+            show_cached_figure(
+                ("esfuerzos", "elemento") + estado + angulo,
+                "elemento_esfuerzos",
+                draw_element,
+            )
+
+
+angle_section()
@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 # En este módulo se definen funciones para transformación de esfuerzos y deformaciones
 # además de funciones para graficar el círculo de Mohr y el elemento rotando en matplotlib
@@ -69,6 +68,272 @@ def principal_stress(sigma_x, sigma_y, tau_xy):
     )
 
 
+# Function to compute principal stresses for arrays of stress states.
+# Mismo resultado que principal_stress, pero los if se reemplazan por np.where
+# para evaluar todos los estados en una sola pasada
+def principal_stress_batch(sigma_x, sigma_y, tau_xy):
+    sigma_x, sigma_y, tau_xy = np.broadcast_arrays(
+        np.asarray(sigma_x, dtype=float),
+        np.asarray(sigma_y, dtype=float),
+        np.asarray(tau_xy, dtype=float),
+    )
+    diff = sigma_x - sigma_y
+
+    tau_max = np.sqrt((np.square(diff / 2) + np.square(tau_xy)))
+    sigma_tau = (sigma_x + sigma_y) / 2
+    sigma_1 = sigma_tau + tau_max
+    sigma_2 = sigma_tau - tau_max
+
+    # considera el caso en que se indefine atan, sin dividir entre cero
+    shear_nonzero = tau_xy != 0
+    theta_tau = np.where(
+        shear_nonzero,
+        np.arctan(
+            np.divide(-diff, 2 * tau_xy, out=np.zeros_like(diff), where=shear_nonzero)
+        )
+        / 2,
+        np.pi / 4.0,
+    )
+
+    diff_nonzero = diff != 0
+    theta_1 = np.where(
+        diff_nonzero,
+        np.arctan(
+            np.divide(2 * tau_xy, diff, out=np.zeros_like(diff), where=diff_nonzero)
+        )
+        / 2,
+        np.pi / 4.0,
+    )
+
+    sigma_x_prime, _, _ = transform_stress(
+        sigma_x, sigma_y, tau_xy, np.degrees(theta_1)
+    )
+
+    swap = np.round(sigma_x_prime) != np.round(sigma_1)
+    theta_2 = np.where(swap, theta_1, theta_1 + np.pi / 2)
+    theta_1 = np.where(swap, theta_1 + np.pi / 2, theta_1)
+
+    _, _, tau_max = transform_stress(sigma_x, sigma_y, tau_xy, np.degrees(theta_tau))
+
+    return (
+        sigma_1,
+        sigma_2,
+        np.degrees(theta_1),
+        np.degrees(theta_2),
+        tau_max,
+        sigma_tau,
+        np.degrees(theta_tau),
+    )
+
+
+# Solo los esfuerzos principales (sigma_1, sigma_2) de arreglos de estados,
+# sin los ángulos de principal_stress_batch, para cuando solo se necesitan
+# los criterios de falla
+def principal_values_batch(sigma_x, sigma_y, tau_xy):
+    sigma_x = np.asarray(sigma_x, dtype=float)
+    sigma_y = np.asarray(sigma_y, dtype=float)
+    sigma_tau = (sigma_x + sigma_y) / 2
+    tau_max = np.hypot((sigma_x - sigma_y) / 2, tau_xy)
+    return sigma_tau + tau_max, sigma_tau - tau_max
+
+
+# ----- Esfuerzos en 3D -----
+# Las funciones reciben las seis componentes del tensor como arreglos del
+# mismo tamaño (o escalares), en el orden sigma_x, sigma_y, sigma_z, tau_xy,
+# tau_yz, tau_xz
+
+
+# Tensores como arreglo (..., 3, 3) para np.linalg
+def stress_tensor_3d(sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz):
+    components = np.broadcast_arrays(
+        *(
+            np.asarray(value, dtype=float)
+            for value in (sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz)
+        )
+    )
+    sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz = components
+    return np.stack(
+        [
+            np.stack([sigma_x, tau_xy, tau_xz], axis=-1),
+            np.stack([tau_xy, sigma_y, tau_yz], axis=-1),
+            np.stack([tau_xz, tau_yz, sigma_z], axis=-1),
+        ],
+        axis=-2,
+    )
+
+
+# Esfuerzos principales sigma_1 >= sigma_2 >= sigma_3 para arreglos de tensores.
+# Con method="invariants" se usa la solución cerrada de la cúbica con los
+# invariantes del desviador y el ángulo de Lode, sin armar matrices; es la más
+# rápida, pero cerca de raíces repetidas pierde precisión (error relativo del
+# orden de 1e-8). Con method="eigh" se usa np.linalg.eigvalsh sobre todos los
+# tensores a la vez, exacta a precisión de máquina.
+# Devuelve (sigma_1, sigma_2, sigma_3, tau_max) con tau_max el cortante máximo
+# absoluto (sigma_1 - sigma_3) / 2
+def principal_stress_3d(
+    sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz, method="invariants"
+):
+    if method == "eigh":
+        tensor = stress_tensor_3d(sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz)
+        # eigvalsh devuelve los valores en orden ascendente
+        values = np.linalg.eigvalsh(tensor)
+        sigma_1, sigma_2, sigma_3 = values[..., 2], values[..., 1], values[..., 0]
+    elif method == "invariants":
+        sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz = np.broadcast_arrays(
+            *(
+                np.asarray(value, dtype=float)
+                for value in (sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz)
+            )
+        )
+        mean = (sigma_x + sigma_y + sigma_z) / 3
+        s_x = sigma_x - mean
+        s_y = sigma_y - mean
+        s_z = sigma_z - mean
+        shear2 = tau_xy**2 + tau_yz**2 + tau_xz**2
+        j2 = (s_x**2 + s_y**2 + s_z**2) / 2 + shear2
+        j3 = (
+            s_x * s_y * s_z
+            + 2 * tau_xy * tau_yz * tau_xz
+            - s_x * tau_yz**2
+            - s_y * tau_xz**2
+            - s_z * tau_xy**2
+        )
+
+        # ángulo de Lode, si j2 = 0 el estado es hidrostático
+        hydrostatic = j2 <= 0
+        cos3 = np.divide(
+            1.5 * np.sqrt(3.0) * j3,
+            j2**1.5,
+            out=np.ones_like(j2),
+            where=~hydrostatic,
+        )
+        lode = np.arccos(np.clip(cos3, -1.0, 1.0)) / 3
+        radius = 2 * np.sqrt(np.maximum(j2, 0.0) / 3)
+        sigma_1 = mean + radius * np.cos(lode)
+        sigma_2 = mean + radius * np.cos(lode - 2 * np.pi / 3)
+        sigma_3 = mean + radius * np.cos(lode + 2 * np.pi / 3)
+    else:
+        raise ValueError(f"method debe ser 'invariants' o 'eigh', no {method!r}")
+
+    return sigma_1, sigma_2, sigma_3, (sigma_1 - sigma_3) / 2
+
+
+# Direcciones principales: arreglo (..., 3, 3) cuyas columnas son los vectores
+# unitarios de sigma_1, sigma_2 y sigma_3, en ese orden
+def principal_directions_3d(sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz):
+    tensor = stress_tensor_3d(sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz)
+    _, vectors = np.linalg.eigh(tensor)
+    return vectors[..., ::-1]
+
+
+# Esfuerzos equivalentes de von Mises y Tresca a partir de los principales
+def equivalent_stress_3d(sigma_1, sigma_2, sigma_3):
+    von_mises = np.sqrt(
+        ((sigma_1 - sigma_2) ** 2 + (sigma_2 - sigma_3) ** 2 + (sigma_3 - sigma_1) ** 2)
+        / 2
+    )
+    tresca = np.maximum(np.maximum(sigma_1, sigma_2), sigma_3) - np.minimum(
+        np.minimum(sigma_1, sigma_2), sigma_3
+    )
+    return von_mises, tresca
+
+
+# Componentes (sigma_x, sigma_y, sigma_z, tau_xy, tau_yz, tau_xz) de un
+# arreglo de tensores (..., 3, 3), inversa de stress_tensor_3d
+def tensor_components_3d(tensor):
+    return (
+        tensor[..., 0, 0],
+        tensor[..., 1, 1],
+        tensor[..., 2, 2],
+        tensor[..., 0, 1],
+        tensor[..., 1, 2],
+        tensor[..., 0, 2],
+    )
+
+
+# ----- Rotación de tensores por lotes -----
+# Cada elemento tiene su propia rotación. Sirven igual para deformaciones si el
+# tensor se arma con las deformaciones tensoriales (gamma / 2 fuera de la
+# diagonal)
+
+
+# Rota N tensores 2D (..., 2, 2) cada uno por su ángulo theta (°), con la misma
+# convención que transform_stress. Se usa la forma cerrada (ángulo doble), más
+# barata que el producto de matrices
+def rotate_tensors_2d(tensors, theta, out=None):
+    tensors = np.asarray(tensors, dtype=float)
+    theta_rad = np.radians(theta)
+    c = np.cos(2 * theta_rad)
+    s = np.sin(2 * theta_rad)
+    sigma_x = tensors[..., 0, 0]
+    sigma_y = tensors[..., 1, 1]
+    tau_xy = tensors[..., 0, 1]
+    center = (sigma_x + sigma_y) / 2
+    half = (sigma_x - sigma_y) / 2
+
+    if out is None:
+        out = np.empty(np.broadcast(tensors[..., 0, 0], theta).shape + (2, 2))
+    out[..., 0, 0] = center + half * c + tau_xy * s
+    out[..., 1, 1] = center - half * c - tau_xy * s
+    out[..., 0, 1] = -half * s + tau_xy * c
+    out[..., 1, 0] = out[..., 0, 1]
+    return out
+
+
+# Matrices de rotación 3D (..., 3, 3) alrededor del eje z por theta (°):
+# el caso 2D dentro de rotate_tensors_3d
+def rotation_matrix_z(theta):
+    theta_rad = np.radians(np.asarray(theta, dtype=float))
+    c = np.cos(theta_rad)
+    s = np.sin(theta_rad)
+    rotation = np.zeros(theta_rad.shape + (3, 3))
+    rotation[..., 0, 0] = c
+    rotation[..., 0, 1] = s
+    rotation[..., 1, 0] = -s
+    rotation[..., 1, 1] = c
+    rotation[..., 2, 2] = 1.0
+    return rotation
+
+
+# Rota N tensores 3D (..., 3, 3) con N matrices de rotación (..., 3, 3), o una
+# sola para todos: T' = R T R^T. Las filas de R son los ejes del sistema local
+# (material, soldadura...) escritos en el sistema global. La contracción se
+# hace en una sola llamada a einsum sobre todo el lote
+def rotate_tensors_3d(tensors, rotations, out=None):
+    return np.einsum(
+        "...ij,...jk,...lk->...il",
+        np.asarray(rotations, dtype=float),
+        np.asarray(tensors, dtype=float),
+        np.asarray(rotations, dtype=float),
+        out=out,
+        optimize=True,
+    )
+
+
+# Tabla de la transformación para todo el rango -180°..180° con paso step,
+# calculada en una sola llamada vectorizada. Devuelve (angulos, sigma_x_prime,
+# sigma_y_prime, tau_x_y_prime). El paso de 1° es el del slider y del gráfico
+# interactivo (unos 12 kB por estado); los ángulos fuera de la malla los
+# calcula sweep_lookup directamente
+def transform_sweep(sigma_x, sigma_y, tau_xy, step=1.0):
+    angles = np.linspace(-180.0, 180.0, int(round(360.0 / step)) + 1)
+    sweep = (angles,) + transform_stress(sigma_x, sigma_y, tau_xy, angles)
+    for values in sweep:
+        values.setflags(write=False)
+    return sweep
+
+
+# Busca theta en la tabla de transform_sweep del mismo estado. Si theta no cae
+# en la malla de ángulos se calcula directamente
+def sweep_lookup(sweep, sigma_x, sigma_y, tau_xy, theta):
+    angles = sweep[0]
+    step = (angles[-1] - angles[0]) / (len(angles) - 1)
+    i = int(round((theta - angles[0]) / step))
+    if 0 <= i < len(angles) and abs(angles[i] - theta) < 1e-9:
+        return sweep[1][i], sweep[2][i], sweep[3][i]
+    return transform_stress(sigma_x, sigma_y, tau_xy, theta)
+
+
 def plot_mohrs_circle(sigma_x, sigma_y, tau_xy, theta, x_axis_label, y_axis_label, ax):
 
     center = (sigma_x + sigma_y) / 2
@@ -228,3 +493,183 @@ def draw_stress(
 
     else:
         pass
+
+
+# dibujo del elemento rotado theta con los esfuerzos transformados en cada cara.
+# max_normal y max_shear escalan el largo de las flechas
+def plot_element(
+    sigma_x_prime, sigma_y_prime, tau_x_y_prime, theta, max_normal, max_shear, ax
+):
+    puntos = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1], [-1, -1]])
+    theta_rad = np.radians(-theta)
+    rotmat = np.array(
+        [
+            [np.cos(theta_rad), -np.sin(theta_rad)],
+            [np.sin(theta_rad), np.cos(theta_rad)],
+        ]
+    )
+
+    # calculo de puntos del elemento cuadrado según la rotación theta
+    puntos_rot = np.dot(puntos, rotmat)
+
+    # ejes que rotan
+    padding = 0.2
+    ejes_prima = np.array([[2, 0], [0, 0], [0, 2]])
+    ejes_text_prima = np.array(
+        [
+            [ejes_prima[0][0], ejes_prima[0][1] - padding / 2.0],
+            [ejes_prima[2][0] + padding / 4.0, ejes_prima[2][1]],
+        ]
+    )
+    ejes_prima = np.dot(ejes_prima, rotmat)
+    ejes_text_prima = np.dot(ejes_text_prima, rotmat)
+
+    ax.plot(puntos_rot[:, 0], puntos_rot[:, 1])
+    ax.plot(ejes_prima[:, 0], ejes_prima[:, 1], color="r", linewidth="1")
+
+    ax.text(
+        ejes_text_prima[0][0],
+        ejes_text_prima[0][1],
+        "x'",
+        rotation=theta,
+        color="r",
+    )
+    ax.text(
+        ejes_text_prima[1][0],
+        ejes_text_prima[1][1],
+        "y'",
+        rotation=theta,
+        color="r",
+    )
+
+    # draw normal stresses
+    arrow_len_max = 0.5
+    x_ini = 1
+    y_ini = 0
+
+    # sigma_x_prime, right
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_normal,
+        sigma_x_prime,
+        "right",
+        "normal",
+        ax,
+    )
+
+    # sigma_y_prime, top
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_normal,
+        sigma_y_prime,
+        "top",
+        "normal",
+        ax,
+    )
+
+    # sigma_x_prime, left
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_normal,
+        sigma_x_prime,
+        "left",
+        "normal",
+        ax,
+    )
+
+    # sigma_y_prime, bottom
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_normal,
+        sigma_y_prime,
+        "bottom",
+        "normal",
+        ax,
+    )
+
+    # draw shear stresses
+    padding = 0.1
+    arrow_len_max = 1.5
+    x_ini = 1
+    y_ini = 0
+
+    # tay_xy_prime, right
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_shear,
+        tau_x_y_prime,
+        "right",
+        "shear",
+        ax,
+    )
+
+    # tay_xy_prime, top
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_shear,
+        tau_x_y_prime,
+        "top",
+        "shear",
+        ax,
+    )
+
+    # tay_xy_prime, left
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_shear,
+        tau_x_y_prime,
+        "left",
+        "shear",
+        ax,
+    )
+
+    # tay_xy_prime, bottom
+    draw_stress(
+        padding,
+        arrow_len_max,
+        theta,
+        x_ini,
+        y_ini,
+        max_shear,
+        tau_x_y_prime,
+        "bottom",
+        "shear",
+        ax,
+    )
+
+    ax.set_aspect("equal")
+    ax.set(xlim=(-2, 2))
+    ax.set(ylim=(-2, 2))
+    ax.spines[["right", "top"]].set_visible(False)
+    ax.spines["left"].set_position("zero")
+    ax.spines["bottom"].set_position("zero")
+    ax.xaxis.set_ticks([])
+    ax.yaxis.set_ticks([])
@@ -0,0 +1,204 @@
+import threading
+
+import numpy as np
+import streamlit as st
+from figurefunc import session_subplots, show_figure
+from fsmapfunc import map_image, plot_fs_image
+from parallelfunc import default_workers
+from sweepfunc import SWEEP_COLUMNS, Sweep, sweep_axes
+
+NOMBRES_CRITERIOS = {
+    "tresca": "Tresca",
+    "von_mises": "von Mises",
+    "rankine": "Rankine",
+    "mohr": "Mohr",
+}
+ETIQUETAS = {
+    "sigma_x": "$\\sigma_{x}$",
+    "sigma_y": "$\\sigma_{y}$",
+    "tau_xy": "$\\tau_{xy}$",
+}
+# el campo de FS guarda 4 bytes por combinación (40 MB con el máximo)
+MAX_COMBINACIONES = 10_000_000
+MAX_BLOQUE = 1_000_000
+
+st.title("Barrido de cargas")
+st.set_page_config(page_title="Barrido de cargas", layout=None)
+
+materiales = ["Dúctil", "Frágil - Rankine", "Frágil - Mohr"]
+
+with st.container(border=True):
+    st.write(
+        "Se evalúan todas las combinaciones de $\\sigma_{x}$, $\\sigma_{y}$ y "
+        "$\\tau_{xy}$ en los rangos dados y se busca la de menor factor de "
+        "seguridad. La malla se evalúa por bloques en paralelo."
+    )
+    col1, col2, col3 = st.columns(3)
+    with col3:
+        seleccion_material = st.radio("Tipo de material", options=materiales)
+
+    material = {}
+    if seleccion_material == "Dúctil":
+        with col1:
+            material["sigma_yield"] = st.number_input(
+                "$\\sigma_{YP}$", value=100.0, min_value=1.0, step=1.0
+            )
+    elif seleccion_material == "Frágil - Mohr":
+        with col1:
+            material["sigma_ut"] = st.number_input(
+                "$\\sigma_{UT}$", value=100.0, min_value=1.0, step=1.0
+            )
+        with col2:
+            material["sigma_uc"] = st.number_input(
+                "$\\sigma_{UC}$", value=200.0, min_value=1.0, step=1.0
+            )
+    else:
+        with col1:
+            material["sigma_u"] = st.number_input(
+                "$\\sigma_{U}$", value=100.0, min_value=1.0, step=1.0
+            )
+
+    rangos = []
+    for nombre in SWEEP_COLUMNS:
+        cols = st.columns(3)
+        with cols[0]:
+            minimo = st.number_input(
+                f"{ETIQUETAS[nombre]} mínimo", value=-100.0, step=10.0
+            )
+        with cols[1]:
+            maximo = st.number_input(
+                f"{ETIQUETAS[nombre]} máximo", value=100.0, step=10.0
+            )
+        with cols[2]:
+            puntos = st.number_input(
+                f"Puntos en {ETIQUETAS[nombre]}",
+                value=101,
+                min_value=1,
+                max_value=500,
+                step=10,
+            )
+        rangos.append((minimo, maximo, puntos))
+    combinaciones = int(np.prod([puntos for _, _, puntos in rangos]))
+
+    cols = st.columns(2)
+    with cols[0]:
+        tile_size = st.number_input(
+            "Puntos por bloque",
+            min_value=1_000,
+            max_value=MAX_BLOQUE,
+            value=262_144,
+            step=10_000,
+        )
+    with cols[1]:
+        hilos = st.number_input(
+            "Hilos",
+            min_value=1,
+            max_value=default_workers(),
+            value=default_workers(),
+            step=1,
+        )
+    st.caption(f"{combinaciones:,} combinaciones")
+    if combinaciones > MAX_COMBINACIONES:
+        st.error(f"El barrido está limitado a {MAX_COMBINACIONES:,} combinaciones")
+    iniciar = st.button("Iniciar barrido", disabled=combinaciones > MAX_COMBINACIONES)
+
+if iniciar:
+    anterior = st.session_state.get("barrido")
+    if anterior is not None:
+        anterior.cancel()
+    barrido = Sweep(sweep_axes(rangos), int(tile_size), int(hilos), **material)
+    hilo = threading.Thread(target=barrido.run, daemon=True)
+    hilo.start()
+    st.session_state["barrido"] = barrido
+    st.session_state["barrido_hilo"] = hilo
+
+barrido = st.session_state.get("barrido")
+hilo = st.session_state.get("barrido_hilo")
+activo = hilo is not None and hilo.is_alive()
+
+
+# avance del barrido en curso; se actualiza solo, sin volver a correr la
+# página, y al terminar se corre la página completa para mostrar resultados
+@st.fragment(run_every=0.5 if activo else None)
+def avance():
+    if not hilo.is_alive():
+        st.rerun()
+    st.progress(
+        barrido.progress,
+        f"Bloques: {barrido.done:,} de {barrido.total:,} "
+        f"({barrido.summary.count:,} combinaciones)",
+    )
+    if st.button("Cancelar", disabled=barrido.cancelled):
+        barrido.cancel()
+
+
+if activo:
+    avance()
+elif barrido is not None and barrido.summary.count:
+    if barrido.cancelled and not barrido.finished:
+        st.warning(
+            f"Barrido cancelado: se evaluaron {barrido.summary.count:,} de "
+            f"{barrido.size:,} combinaciones"
+        )
+    summary = barrido.summary
+    governing = summary.governing()
+    sigma_x, sigma_y, tau_xy = summary.worst_state[governing]
+    st.success(
+        f"Combinación que gobierna: {NOMBRES_CRITERIOS[governing]} con "
+        f"FS = {summary.min_fs[governing]:.2f} en "
+        f"$\\sigma_{{x}}$ = {sigma_x:.2f}, $\\sigma_{{y}}$ = {sigma_y:.2f}, "
+        f"$\\tau_{{xy}}$ = {tau_xy:.2f}"
+    )
+    with st.container(border=True):
+        cols = st.columns(len(summary.min_fs))
+        for col, name in zip(cols, summary.min_fs):
+            with col:
+                st.subheader(NOMBRES_CRITERIOS[name])
+                st.metric("$FS_{min}$", f"{summary.min_fs[name]:.2f}")
+                st.metric("Combinaciones en falla", f"{summary.failing[name]:,}")
+
+    # corte del campo de FS (el menor de los criterios) con una componente fija
+    with st.container(border=True):
+        st.write("Cortes del campo de factor de seguridad")
+        peor = barrido.worst_point(governing)
+        fija = st.radio(
+            "Componente fija",
+            options=list(SWEEP_COLUMNS),
+            index=2,
+            format_func=ETIQUETAS.get,
+            horizontal=True,
+        )
+        eje = SWEEP_COLUMNS.index(fija)
+        valores = barrido.axes[eje]
+        indice = st.select_slider(
+            f"Valor de {ETIQUETAS[fija]}",
+            options=range(len(valores)),
+            value=int(peor[eje]),
+            format_func=lambda i: f"{valores[i]:.2f}",
+        )
+        libres = [i for i in range(len(SWEEP_COLUMNS)) if i != eje]
+        corte = np.take(barrido.field, indice, axis=eje)
+        eje_x, eje_y = (barrido.axes[i] for i in libres)
+
+        fig, ax = session_subplots("barrido")
+        # filas según el segundo eje libre; misma escala de colores que los
+        # mapas de Criterios de falla
+        plot_fs_image(
+            map_image(corte.T),
+            (eje_x[0], eje_x[-1], eje_y[0], eje_y[-1]),
+            ax,
+            aspect="auto",
+        )
+        if len(eje_x) > 1 and len(eje_y) > 1:
+            ax.contour(eje_x, eje_y, corte.T, levels=[1.0], colors="k", linewidths=1.0)
+        if peor[eje] == indice:
+            ax.plot(
+                [barrido.axes[libres[0]][peor[libres[0]]]],
+                [barrido.axes[libres[1]][peor[libres[1]]]],
+                "bo",
+                markersize=4,
+            )
+        ax.set_xlabel(ETIQUETAS[SWEEP_COLUMNS[libres[0]]])
+        ax.set_ylabel(ETIQUETAS[SWEEP_COLUMNS[libres[1]]])
+        ax.set_title(f"{ETIQUETAS[fija]} = {valores[indice]:.2f}")
+        show_figure(fig)
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bulkfunc import StreamSummary
+from failurefunc import evaluate_criteria
+from parallelfunc import default_workers, evaluate_blocks
+from stressfunc import principal_values_batch
+
+# En este módulo se barren sigma_x, sigma_y y tau_xy sobre una malla 3D de
+# parámetros para encontrar la combinación con el menor factor de seguridad
+# (el caso de carga que gobierna). La malla no se arma completa: los puntos
+# se recorren en orden en bloques (tiles) de a lo más tile_size puntos, que
+# se evalúan en paralelo en hilos (numpy libera el GIL en las operaciones
+# sobre arreglos). Solo se guarda el FS menor de los criterios en cada punto
+# (float32) para dibujar cortes del campo, y el resumen de StreamSummary: cada
+# tile se resume en su hilo y sus arreglos se liberan ahí mismo. Los tiles en
+# vuelo suman a lo más MAX_POINTS_IN_FLIGHT puntos, así que la memoria
+# temporal no depende del número de hilos.
+# El barrido se puede cancelar desde otro hilo con Sweep.cancel()
+
+SWEEP_COLUMNS = ("sigma_x", "sigma_y", "tau_xy")
+MAX_POINTS_IN_FLIGHT = 2_097_152
+
+
+# Ejes del barrido: ranges tiene un (mínimo, máximo, puntos) por cada
+# componente de SWEEP_COLUMNS
+def sweep_axes(ranges):
+    if len(ranges) != len(SWEEP_COLUMNS):
+        raise ValueError(
+            f"Se necesitan rangos para {', '.join(SWEEP_COLUMNS)}, se dieron "
+            f"{len(ranges)}"
+        )
+    axes = []
+    for name, (low, high, points) in zip(SWEEP_COLUMNS, ranges):
+        if int(points) < 1:
+            raise ValueError(f"El eje {name} necesita al menos un punto")
+        axes.append(np.linspace(low, high, int(points)))
+    return tuple(axes)
+
+
+# Estados (n, 3) de los puntos start:stop de la malla, en el orden de
+# np.ravel (sigma_x varía más lento, tau_xy más rápido)
+def tile_states(axes, start, stop):
+    shape = tuple(len(axis) for axis in axes)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    return np.column_stack([axis[i] for axis, i in zip(axes, index)])
+
+
+class Sweep:
+    def __init__(self, axes, tile_size=262_144, workers=None, **material):
+        self.axes = tuple(np.asarray(axis, dtype=float) for axis in axes)
+        self.shape = tuple(len(axis) for axis in self.axes)
+        self.size = int(np.prod(self.shape))
+        self.tile_size = min(int(tile_size), MAX_POINTS_IN_FLIGHT)
+        # tiles que se evalúan o esperan a la vez; más hilos no ayudarían
+        self.window = MAX_POINTS_IN_FLIGHT // self.tile_size
+        self.workers = min(workers or default_workers(), default_workers(), self.window)
+        self.material = material
+        if not evaluate_criteria(0.0, 0.0, **material):
+            raise ValueError("Se necesita al menos una resistencia para evaluar")
+
+        # FS menor de los criterios en cada punto; nan en los puntos que no
+        # se evaluaron (barrido cancelado)
+        self.field = np.full(self.shape, np.nan, dtype=np.float32)
+        self.summary = StreamSummary()
+        self.total = -(-self.size // self.tile_size)
+        self.done = 0
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.done == self.total
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
+
+    # esfuerzos principales y criterios de un tile, resumidos en el hilo que
+    # lo evalúa; el campo se escribe desde ahí (cada tile tiene su propia parte)
+    def _evaluate_tile(self, tile):
+        start, stop = tile
+        states = tile_states(self.axes, start, stop)
+        sigma_1, sigma_2 = principal_values_batch(*states.T)
+        results = {}
+        for name, (failure_bool, fs) in evaluate_criteria(
+            sigma_1, sigma_2, **self.material
+        ).items():
+            results[f"fail_{name}"] = failure_bool
+            results[f"fs_{name}"] = fs
+        governing = np.minimum.reduce(
+            [results[key] for key in results if key.startswith("fs_")]
+        )
+        self.field.reshape(-1)[start:stop] = governing
+        summary = StreamSummary()
+        summary.update(states, results)
+        return summary
+
+    # tiles que faltan, hasta que se cancele el barrido
+    def _tiles(self):
+        for start in range(self.done * self.tile_size, self.size, self.tile_size):
+            if self._cancel.is_set():
+                return
+            yield start, min(start + self.tile_size, self.size)
+
+    # Evalúa todos los tiles y devuelve el resumen. on_tile(sweep) se llama
+    # después de cada tile. Los tiles se reciben en orden, así que
+    # summary.worst_index es el índice plano del punto en la malla
+    def run(self, on_tile=None):
+        with ThreadPoolExecutor(self.workers) as executor:
+            for summary in evaluate_blocks(
+                self._tiles(), self._evaluate_tile, executor, self.window
+            ):
+                self.summary.merge(summary)
+                self.done += 1
+                if on_tile is not None:
+                    on_tile(self)
+        return self.summary
+
+    # índices (i, j, k) en la malla del peor punto de un criterio
+    def worst_point(self, criterion):
+        return np.unravel_index(self.summary.worst_index[criterion], self.shape)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from failurefunc import (
+    mohr,
+    mohr_batch,
+    rankine,
+    rankine_batch,
+    tresca,
+    tresca_batch,
+    von_mises,
+    von_mises_batch,
+)
+
+# estados (sigma1, sigma2): dentro y fuera de las envolventes, con signos
+# iguales y opuestos, y con sigma1 == sigma2 (círculo de Mohr de radio cero)
+STATES = [
+    (50.0, 100.0),
+    (-80.0, 30.0),
+    (250.0, -40.0),
+    (-300.0, -350.0),
+    (100.0, 100.0),
+    (-150.0, -150.0),
+    (-3000.0, -3000.0),
+    (300.0, 300.0),
+]
+
+CRITERIA = [
+    (tresca, tresca_batch, {"sigma_yield": 120.0}),
+    (von_mises, von_mises_batch, {"sigma_yield": 120.0}),
+    (rankine, rankine_batch, {"sigma_u": 120.0}),
+    (mohr, mohr_batch, {"sigma_uc": 300.0, "sigma_ut": 100.0}),
+]
+
+
+@pytest.mark.parametrize("scalar, batch, material", CRITERIA)
+def test_scalar_matches_batch(scalar, batch, material):
+    sigma1, sigma2 = np.array(STATES).T
+    failure_batch, fs_batch = batch(sigma1, sigma2, **material)
+    for i, (s1, s2) in enumerate(STATES):
+        failure_bool, fs = scalar(s1, s2, **material)
+        assert failure_bool == failure_batch[i]
+        assert fs == pytest.approx(fs_batch[i])
+
+
+@pytest.mark.parametrize(
+    "sigma, expected",
+    [(100.0, (False, np.inf)), (-150.0, (False, np.inf)), (300.0, (True, 0.0))],
+)
+def test_mohr_zero_radius(sigma, expected):
+    assert mohr(sigma, sigma, 300.0, 100.0) == expected
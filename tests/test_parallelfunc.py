@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from parallelfunc import evaluate_files_parallel
+
+MATERIAL = {"sigma_yield": 250.0}
+
+
+@pytest.fixture
+def npy_input(tmp_path):
+    path = tmp_path / "estados.npy"
+    np.save(path, np.array([[100.0, 20.0, 30.0], [-50.0, 10.0, 0.0]]))
+    return str(path)
+
+
+def test_writes_results_next_to_input(npy_input, tmp_path):
+    (summary,) = evaluate_files_parallel([npy_input], workers=1, **MATERIAL)
+    assert summary.count == 2
+    assert (tmp_path / "estados-resultados.npy").exists()
+
+
+def test_refuses_existing_results(npy_input, tmp_path):
+    results = tmp_path / "estados-resultados.npy"
+    results.write_bytes(b"anterior")
+    with pytest.raises(FileExistsError):
+        evaluate_files_parallel([npy_input], workers=1, **MATERIAL)
+    assert results.read_bytes() == b"anterior"
+
+    evaluate_files_parallel([npy_input], workers=1, overwrite=True, **MATERIAL)
+    assert np.load(results).shape == (2,)
+
+
+def test_output_dir(npy_input, tmp_path):
+    output_dir = tmp_path / "salida"
+    output_dir.mkdir()
+    evaluate_files_parallel(
+        [npy_input], workers=1, output_dir=str(output_dir), **MATERIAL
+    )
+    assert (output_dir / "estados-resultados.npy").exists()
+
+
+def test_refuses_results_as_input(npy_input, tmp_path):
+    evaluate_files_parallel([npy_input], workers=1, **MATERIAL)
+    with pytest.raises(ValueError, match="resultados"):
+        evaluate_files_parallel(
+            [str(tmp_path / "estados-resultados.npy")], workers=1, **MATERIAL
+        )
@@ -0,0 +1,22 @@
+import json
+import logging
+
+import numpy as np
+
+from profilefunc import profile_run, stage
+
+
+# el pico de una etapa incluye lo que asignó antes de abrir una etapa hija
+def test_parent_peak_before_child(caplog):
+    with caplog.at_level(logging.INFO, logger="solidlab.profile"):
+        with profile_run("prueba", enabled=True):
+            with stage("padre"):
+                values = np.ones(2_000_000)
+                del values
+                with stage("hija"):
+                    np.ones(1_000)
+    record = json.loads(caplog.records[-1].getMessage())
+    stages = record["etapas"]
+    assert stages["padre"]["pico_kb"] > 15_000
+    assert stages["padre/hija"]["pico_kb"] < 1_000
+    assert record["total"]["pico_kb"] >= stages["padre"]["pico_kb"]
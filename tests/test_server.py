@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from server import EvaluationServer, _query_options
+
+
+@pytest.fixture
+def server():
+    server = EvaluationServer(("127.0.0.1", 0), workers=1)
+    yield server
+    server.server_close()
+
+
+STATES = np.array([[1e-4, 0.0, 0.0]])
+
+
+@pytest.mark.parametrize("strain", ["false", "true", 0, 1, None])
+def test_strain_must_be_boolean(server, strain):
+    with pytest.raises(ValueError, match="strain"):
+        server.evaluate(STATES, {"strain": strain})
+
+
+def test_strain_boolean(server):
+    assert "fs_tresca" in server.evaluate(
+        STATES, {"strain": False, "sigma_yield": 250.0}
+    )
+    assert "fs_tresca" not in server.evaluate(STATES, {"strain": True})
+
+
+def test_query_strain():
+    assert _query_options("strain=false") == {"strain": False}
+    assert _query_options("strain=1") == {"strain": True}
+    with pytest.raises(ValueError, match="strain"):
+        _query_options("strain=quizas")
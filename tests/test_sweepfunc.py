@@ -0,0 +1,37 @@
+import numpy as np
+
+from bulkfunc import StreamSummary
+from failurefunc import evaluate_criteria
+from stressfunc import principal_values_batch
+from sweepfunc import Sweep, sweep_axes, tile_states
+
+MATERIAL = {"sigma_yield": 100.0, "sigma_uc": 200.0, "sigma_ut": 100.0}
+
+
+# el barrido por tiles da el mismo resumen y el mismo campo que evaluar toda
+# la malla de una vez
+def test_tiles_match_full_grid():
+    axes = sweep_axes([(-300.0, 300.0, 21), (-300.0, 300.0, 17), (-100.0, 100.0, 13)])
+    sweep = Sweep(axes, tile_size=1_000, workers=2, **MATERIAL)
+    sweep.run()
+
+    states = tile_states(axes, 0, sweep.size)
+    sigma_1, sigma_2 = principal_values_batch(*states.T)
+    results = {}
+    for name, (failure_bool, fs) in evaluate_criteria(
+        sigma_1, sigma_2, **MATERIAL
+    ).items():
+        results[f"fail_{name}"] = failure_bool
+        results[f"fs_{name}"] = fs
+    expected = StreamSummary()
+    expected.update(states, results)
+
+    assert sweep.finished
+    assert sweep.summary.count == expected.count
+    assert sweep.summary.failing == expected.failing
+    assert sweep.summary.min_fs == expected.min_fs
+    assert sweep.summary.worst_index == expected.worst_index
+    governing = np.minimum.reduce(
+        [results[key] for key in results if key.startswith("fs_")]
+    )
+    np.testing.assert_allclose(sweep.field.reshape(-1), governing.astype(np.float32))